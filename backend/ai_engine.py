@@ -0,0 +1,258 @@
+import asyncio
+import functools
+import importlib
+import inspect
+import os
+import time
+from typing import Dict, Any, AsyncIterator, List
+
+from chat_context import Turn
+from metrics import Histogram
+
+
+class AIResponseTimeout(Exception):
+    """A geração não terminou dentro de AI_RESPONSE_TIMEOUT segundos"""
+
+    def __init__(self, timeout: float):
+        super().__init__(f"AI response did not finish within {timeout}s")
+        self.timeout = timeout
+
+
+class ResponseEngine:
+    """Interface dos motores de resposta do chat.
+
+    generate() pode ser uma corrotina ou um método comum; métodos comuns (clientes HTTP
+    síncronos, modelos locais) rodam numa thread para não travar o event loop. Motores que
+    produzem tokens aos poucos também definem stream() como gerador assíncrono; sem ele,
+    o streaming entrega a resposta inteira num único pedaço.
+    """
+
+    name = "base"
+
+    def generate(self, message: str, context: List[Turn]) -> str:
+        raise NotImplementedError
+
+    def generate_workout(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Plano de treino {"title", "exercises": [{"name", "sets", "reps", "rest"}]} para
+        spec = {"category", "difficulty", "duration_minutes", "constraints"}; category vem como o
+        usuário escreveu e duration_minutes é o texto normalizado quando a duração não pôde ser interpretada"""
+        raise NotImplementedError
+
+
+# Volume (séries, repetições, descanso) por dificuldade normalizada e exercícios do plano simulado
+STUB_VOLUME = {
+    'iniciante': (2, '10', '60s'),
+    'intermediario': (3, '12', '45s'),
+    'avancado': (4, '15', '30s'),
+}
+STUB_EXERCISES = ['Agachamento', 'Flexão de Braço', 'Lunges', 'Prancha', 'Burpee', 'Glute Bridge',
+                  'Mountain Climbers', 'Pike Push-ups', 'Jumping Jacks', 'Agachamento Búlgaro', 'Squat Jump', 'Skipping']
+# Duração usada pelo plano simulado quando o texto pedido não é uma duração reconhecível
+STUB_DEFAULT_MINUTES = 30
+
+
+class StubEngine(ResponseEngine):
+    """Motor local e determinístico: a mesma entrada sempre produz a mesma resposta.
+
+    `latency` simula o tempo de um modelo real (AI_STUB_LATENCY), útil em testes de carga.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = None):
+        self.latency = latency if latency is not None else float(os.getenv("AI_STUB_LATENCY", "0"))
+
+    async def generate(self, message: str, context: List[Turn]) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return f"Resposta da IA para: {message}"
+
+    async def generate_workout(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        sets, reps, rest = STUB_VOLUME.get(spec['difficulty'], STUB_VOLUME['intermediario'])
+        duration = spec['duration_minutes']
+        if isinstance(duration, int):
+            minutes, label = duration, f"{duration} min"
+        else:
+            minutes, label = STUB_DEFAULT_MINUTES, duration
+        count = max(1, min(len(STUB_EXERCISES), minutes // 5))
+        return {
+            "title": f"Treino de {spec['category']} ({label})",
+            "exercises": [
+                {"name": name, "sets": sets, "reps": reps, "rest": rest}
+                for name in STUB_EXERCISES[:count]
+            ],
+        }
+
+    async def stream(self, message: str, context: List[Turn]) -> AsyncIterator[str]:
+        # Mesmo texto de generate(), palavra por palavra; a latência é dividida entre os tokens
+        tokens = f"Resposta da IA para: {message}".split(' ')
+        for index, token in enumerate(tokens):
+            if self.latency:
+                await asyncio.sleep(self.latency / len(tokens))
+            yield token if index == 0 else f" {token}"
+
+
+def load_engine(spec: str = None) -> ResponseEngine:
+    """Instancia o motor de AI_ENGINE: "stub" ou um caminho "pacote.modulo:Classe" """
+    spec = spec or os.getenv("AI_ENGINE", "stub")
+    if spec == "stub":
+        return StubEngine()
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise Exception(f"AI_ENGINE inválido: {spec!r} (use 'stub' ou 'modulo:Classe')")
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+class AIResponder:
+    """Executa o motor de respostas com limite de concorrência, timeout e coalescência.
+
+    No máximo `max_concurrency` gerações rodam ao mesmo tempo; as demais esperam a vez.
+    Pedidos idênticos (mesma mensagem e mesmo contexto) que chegam enquanto uma geração
+    está em andamento recebem o mesmo resultado em vez de disparar outra. O timeout
+    conta a espera por vaga mais a geração; um motor síncrono que estoura o timeout
+    continua ocupando a vaga até a thread terminar.
+    """
+
+    def __init__(self, engine: ResponseEngine = None, timeout: float = None, max_concurrency: int = None):
+        self.engine = engine or load_engine()
+        self.timeout = timeout or float(os.getenv("AI_RESPONSE_TIMEOUT", "30"))
+        self.max_concurrency = max_concurrency or int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight = {}
+        self.generated = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.failed = 0
+        self.streaming = 0
+        self.generation_time = Histogram()
+        self.first_token_time = Histogram()
+
+    def _call_engine(self, method, *args) -> asyncio.Future:
+        """Inicia a chamada ao motor com uma vaga do semáforo já adquirida e devolve o que aguardar.
+
+        A vaga só volta quando a chamada termina de fato. Um timeout cancela a espera, mas não
+        interrompe uma thread; liberar a vaga antes deixaria as chamadas reais ao motor passarem
+        de max_concurrency.
+        """
+        try:
+            if inspect.iscoroutinefunction(method):
+                call = asyncio.ensure_future(method(*args))
+            else:
+                call = asyncio.get_running_loop().run_in_executor(None, functools.partial(method, *args))
+        except BaseException:
+            self._slots.release()
+            raise
+        call.add_done_callback(lambda _: self._slots.release())
+        # Corrotinas param ao ser canceladas; a thread não, então só a espera por ela é cancelada
+        return call if isinstance(call, asyncio.Task) else asyncio.shield(call)
+
+    async def _generate(self, method, *args):
+        await self._slots.acquire()
+        started_at = time.perf_counter()
+        try:
+            return await self._call_engine(method, *args)
+        finally:
+            self.generation_time.observe(time.perf_counter() - started_at)
+
+    async def _run(self, method, *args):
+        try:
+            response = await asyncio.wait_for(self._generate(method, *args), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise AIResponseTimeout(self.timeout)
+        except Exception:
+            self.failed += 1
+            raise
+        self.generated += 1
+        return response
+
+    async def _shared(self, key: tuple, method, *args):
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._run(method, *args))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield: um cliente que desconecta não cancela a geração compartilhada com os outros
+        return await asyncio.shield(task)
+
+    async def respond(self, message: str, context: List[Turn]) -> str:
+        return await self._shared(('chat', message, tuple(context)), self.engine.generate, message, context)
+
+    async def generate_workout(self, spec: Dict[str, Any], key: tuple) -> Dict[str, Any]:
+        """Plano de treino para `spec`; pedidos com a mesma chave normalizada compartilham a geração"""
+        return await self._shared(('workout',) + key, self.engine.generate_workout, spec)
+
+    async def stream(self, message: str, context: List[Turn]) -> AsyncIterator[str]:
+        """Tokens da resposta conforme o motor os produz, sob o mesmo limite de concorrência e timeout.
+
+        Streams não são coalescidos: cada cliente consome seus próprios tokens.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise AIResponseTimeout(self.timeout)
+
+        started_at = time.perf_counter()
+        first_token = True
+        slot_handed_off = False
+        self.streaming += 1
+        try:
+            engine_stream = getattr(self.engine, 'stream', None)
+            if inspect.isasyncgenfunction(engine_stream):
+                tokens = engine_stream(message, context)
+                try:
+                    while True:
+                        remaining = deadline - loop.time()
+                        if remaining <= 0:
+                            raise asyncio.TimeoutError
+                        try:
+                            token = await asyncio.wait_for(tokens.__anext__(), remaining)
+                        except StopAsyncIteration:
+                            break
+                        if first_token:
+                            self.first_token_time.observe(time.perf_counter() - started_at)
+                            first_token = False
+                        yield token
+                finally:
+                    await tokens.aclose()
+            else:
+                # Daqui em diante quem libera a vaga é _call_engine, quando a chamada ao motor terminar
+                slot_handed_off = True
+                call = self._call_engine(self.engine.generate, message, context)
+                response = await asyncio.wait_for(call, max(0, deadline - loop.time()))
+                self.first_token_time.observe(time.perf_counter() - started_at)
+                yield response
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise AIResponseTimeout(self.timeout)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.streaming -= 1
+            if not slot_handed_off:
+                self._slots.release()
+            self.generation_time.observe(time.perf_counter() - started_at)
+        self.generated += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "engine": self.engine.name,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+            "in_flight": len(self._in_flight),
+            "streaming": self.streaming,
+            "generated": self.generated,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "failed": self.failed,
+            "generation_seconds": self.generation_time.snapshot(),
+            "first_token_seconds": self.first_token_time.snapshot(),
+        }
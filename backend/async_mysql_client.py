@@ -0,0 +1,291 @@
+import aiomysql
+from aiomysql import Error
+import asyncio
+import inspect
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
+
+from sql_builder import (insert_many_params, insert_statement, row_insert_statement, rows_insert_statement,
+                         update_statement, delete_statement, select_statement, page_statement, page_result)
+from uuids import uuid_codec
+from db_pool import PoolConfig, PoolStats, PoolTimeout
+from metrics import observe_query
+from query_profiler import database_error
+
+
+async def _run_statement(connection, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+    """Executa um comando numa conexão já emprestada, sem commit"""
+    started = time.perf_counter()
+    async with connection.cursor(aiomysql.DictCursor) as cursor:
+        await cursor.execute(query, params or None)
+
+        if fetch_one:
+            result = await cursor.fetchone()
+            rows = 0 if result is None else 1
+        elif fetch_all:
+            result = await cursor.fetchall()
+            rows = len(result)
+        else:
+            result = rows = cursor.rowcount
+    observe_query(query, params, time.perf_counter() - started, rows)
+    return result
+
+
+async def _run_many(connection, query: str, seq_params: List[tuple]) -> int:
+    """executemany sem commit; o aiomysql reescreve INSERT ... VALUES em uma única instrução multi-linha"""
+    started = time.perf_counter()
+    async with connection.cursor() as cursor:
+        await cursor.executemany(query, seq_params)
+        rowcount = cursor.rowcount
+    observe_query(query, seq_params, time.perf_counter() - started, rowcount)
+    return rowcount
+
+
+class _AsyncRecordOperations:
+    """Operações CRUD sobre execute_query, compartilhadas pelo cliente e pelas transações"""
+
+    async def execute_query(self, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+        raise NotImplementedError
+
+    async def execute_many(self, query: str, seq_params: List[tuple]) -> int:
+        raise NotImplementedError
+
+    async def _record_changed(self, table: str, record_id: str):
+        """Chamado após update/delete por id; os caches se inscrevem via add_change_listener"""
+
+    async def create_record(self, table: str, data: Dict[str, Any]) -> str:
+        """Insere um registro na tabela e retorna o id"""
+        query, params, record_id = insert_statement(table, data)
+        await self.execute_query(query, params)
+        return record_id
+
+    async def create_records(self, table: str, rows: List[Dict[str, Any]], batch_size: int = 500) -> List[str]:
+        """Insere vários registros em INSERTs multi-linha (até batch_size por instrução) e retorna os ids"""
+        if not rows:
+            return []
+        columns, params, ids = insert_many_params(rows)
+        await self.insert_rows(table, columns, params, batch_size)
+        return ids
+
+    async def insert_row(self, table: str, columns: Tuple[str, ...], values: tuple) -> int:
+        """Insere uma linha já serializada (ver serializers.model_row), sem nova conversão"""
+        return await self.execute_query(*row_insert_statement(table, columns, values))
+
+    async def insert_rows(self, table: str, columns: Tuple[str, ...], rows: List[tuple], batch_size: int = 500) -> int:
+        """Insere linhas já serializadas em INSERTs multi-linha de até batch_size linhas"""
+        query, batches = rows_insert_statement(table, columns, rows, batch_size)
+        inserted = 0
+        for batch in batches:
+            inserted += await self.execute_many(query, batch)
+        return inserted
+
+    async def update_record(self, table: str, record_id: str, update_data: Dict[str, Any]) -> int:
+        """Atualiza um registro pelo id, retorna número de linhas afetadas"""
+        affected = await self.execute_query(*update_statement(table, record_id, update_data))
+        await self._record_changed(table, record_id)
+        return affected
+
+    async def delete_record(self, table: str, record_id: str) -> int:
+        """Deleta um registro pelo id, retorna número de linhas afetadas"""
+        affected = await self.execute_query(*delete_statement(table, record_id))
+        await self._record_changed(table, record_id)
+        return affected
+
+    async def find_one(self, table: str, filter_dict: Dict[str, Any],
+                       greater_than: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Primeira linha com colunas iguais a filter_dict e, opcionalmente, maiores que greater_than"""
+        query, params = select_statement(table, filter_dict, greater_than=greater_than)
+        return uuid_codec.decode_row(await self.execute_query(query, params, fetch_one=True))
+
+    async def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        query, params = select_statement(table, filter_dict)
+        return uuid_codec.decode_rows(await self.execute_query(query, params, fetch_all=True))
+
+    async def find_page(self, table: str, filter_dict: Dict[str, Any] = None, sort_column: str = 'created_at',
+                        limit: int = 50, after: Optional[tuple] = None, columns: Optional[List[str]] = None,
+                        descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """Busca uma página ordenada por (sort_column, id) a partir do cursor `after`.
+
+        Retorna as linhas e o cursor (valor de sort_column, id) da próxima página, ou None
+        quando não há mais linhas. Com `columns`, só essas colunas (mais sort_column e id) são lidas.
+        """
+        query, params = page_statement(table, filter_dict, sort_column, limit, after, columns, descending)
+        return page_result(await self.execute_query(query, params, fetch_all=True), limit, sort_column)
+
+
+class AsyncTransaction(_AsyncRecordOperations):
+    """Unidade de trabalho: todos os comandos na mesma conexão, com um único commit no final"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        # Invalidações só são avisadas depois do commit
+        self.changes = []
+
+    async def _record_changed(self, table: str, record_id: str):
+        self.changes.append((table, record_id))
+
+    async def execute_query(self, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+        try:
+            return await _run_statement(self.connection, query, params, fetch_one, fetch_all)
+        except Error as e:
+            raise database_error(query, e) from e
+
+    async def execute_many(self, query: str, seq_params: List[tuple]) -> int:
+        try:
+            return await _run_many(self.connection, query, seq_params)
+        except Error as e:
+            raise database_error(query, e) from e
+
+
+class AsyncMySQLClient(_AsyncRecordOperations):
+    """Variante assíncrona do MySQLClient (mesma interface CRUD) sobre aiomysql"""
+
+    def __init__(self, pool_config: PoolConfig = None):
+        self.pool_config = pool_config or PoolConfig.from_env("async_pool")
+        self.stats = PoolStats(self.pool_config)
+        self.connection_pool = None
+        self.change_listeners = {}
+
+    def add_change_listener(self, table: str, callback):
+        """Registra callback(record_id), síncrono ou async, para updates/deletes em `table`"""
+        self.change_listeners.setdefault(table, []).append(callback)
+
+    async def _record_changed(self, table: str, record_id: str):
+        for callback in self.change_listeners.get(table, ()):
+            result = callback(record_id)
+            if inspect.isawaitable(result):
+                await result
+
+    async def connect(self):
+        """Cria o pool na primeira chamada; deve rodar dentro do event loop"""
+        if self.connection_pool is None:
+            try:
+                self.connection_pool = await aiomysql.create_pool(
+                    user=os.getenv("MYSQL_USER", "root"),
+                    password=os.getenv("MYSQL_PASSWORD", "Pxdrinmv01!"),
+                    host=os.getenv("MYSQL_HOST", "localhost"),
+                    port=int(os.getenv("MYSQL_PORT", "3306")),
+                    db=os.getenv("MYSQL_DATABASE", "zeni_saas"),
+                    minsize=self.pool_config.size,
+                    maxsize=self.pool_config.max_connections,
+                    pool_recycle=self.pool_config.recycle or -1,
+                    # Sem autocommit o aiomysql descarta conexões devolvidas com transação aberta
+                    autocommit=True,
+                )
+            except Error as e:
+                raise Exception(f"Error creating MySQL connection pool: {e}")
+        return self.connection_pool
+
+    async def close(self):
+        if self.connection_pool is not None:
+            self.connection_pool.close()
+            await self.connection_pool.wait_closed()
+            self.connection_pool = None
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Empresta uma conexão do pool, esperando no máximo pool_config.timeout segundos.
+
+        Como no ConnectionPool síncrono, o pool guarda até `size` conexões ociosas: as de
+        overflow (acima disso) são fechadas ao serem devolvidas.
+        """
+        pool = await self.connect()
+        started = time.perf_counter()
+        self.stats.waiters += 1
+        try:
+            connection = await asyncio.wait_for(pool.acquire(), self.pool_config.timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise PoolTimeout(
+                f"Timed out after {self.pool_config.timeout}s waiting for a connection from pool '{self.pool_config.name}'"
+            )
+        finally:
+            self.stats.waiters -= 1
+
+        try:
+            idle = asyncio.get_running_loop().time() - connection.last_usage
+            if self.pool_config.pre_ping and idle > self.pool_config.pre_ping_idle:
+                try:
+                    await connection.ping(reconnect=True)
+                except Error:
+                    self.stats.discarded += 1
+                    raise
+            self.stats.acquired += 1
+            self.stats.acquire_latency.observe(time.perf_counter() - started)
+            yield connection
+        finally:
+            # O aiomysql manteria aberta toda conexão até maxsize; fechada, o release só a esquece.
+            # Com conexões ociosas no pool ninguém está esperando, então não há quem acordar.
+            if pool.freesize >= max(1, self.pool_config.size):
+                connection.close()
+            pool.release(connection)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        pool = self.connection_pool
+        if pool is None:
+            return self.stats.snapshot(in_use=0, idle=0)
+        return self.stats.snapshot(in_use=pool.size - pool.freesize, idle=pool.freesize)
+
+    async def execute_query(self, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+        async with self.acquire() as connection:
+            try:
+                result = await _run_statement(connection, query, params, fetch_one, fetch_all)
+                if not (fetch_one or fetch_all):
+                    await connection.commit()
+                return result
+
+            except Error as e:
+                await connection.rollback()
+                raise database_error(query, e) from e
+
+    async def execute_many(self, query: str, seq_params: List[tuple]) -> int:
+        async with self.acquire() as connection:
+            try:
+                rowcount = await _run_many(connection, query, seq_params)
+                await connection.commit()
+                return rowcount
+
+            except Error as e:
+                await connection.rollback()
+                raise database_error(query, e) from e
+
+    async def iter_all(self, table: str, filter_dict: Dict[str, Any] = None, batch_size: int = 500,
+                       order_by: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Percorre as linhas com cursor do lado do servidor, trazendo batch_size por vez.
+
+        A memória usada não depende do total de linhas; a conexão fica emprestada até o fim da iteração.
+        """
+        query, params = select_statement(table, filter_dict, order_by)
+        async with self.acquire() as connection:
+            async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+                try:
+                    await cursor.execute(query, params or None)
+                    while True:
+                        rows = await cursor.fetchmany(batch_size)
+                        if not rows:
+                            break
+                        for row in rows:
+                            yield uuid_codec.decode_row(row)
+                except Error as e:
+                    raise database_error(query, e) from e
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Fixa uma conexão para vários comandos; commit ao sair, rollback em caso de erro"""
+        async with self.acquire() as connection:
+            await connection.begin()
+            tx = AsyncTransaction(connection)
+            try:
+                yield tx
+                await connection.commit()
+            except BaseException:
+                await connection.rollback()
+                raise
+        for table, record_id in tx.changes:
+            await self._record_changed(table, record_id)
+
+
+# Cria instância global (o pool é aberto no startup da aplicação)
+async_mysql_client = AsyncMySQLClient()
@@ -0,0 +1,145 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Cache LRU em memória com expiração por entrada e contadores de hit/miss/eviction.
+
+    Pensado para uso dentro do event loop (sem lock). `on_evict(key, value)` é chamado
+    quando uma entrada sai por LRU ou expiração, mas não em pop()/clear().
+    """
+
+    def __init__(self, max_entries: int, ttl: float, on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            if self.on_evict:
+                self.on_evict(key, value)
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            evicted_key, (_, evicted_value) = self._data.popitem(last=False)
+            self.evictions += 1
+            if self.on_evict:
+                self.on_evict(evicted_key, evicted_value)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o cabeçalho If-None-Match (lista ou "*") com o ETag da resposta.
+
+    If-None-Match usa comparação fraca (RFC 7232 §3.2): W/"x" casa com "x". Proxies que
+    comprimem a resposta (nginx com gzip) rebaixam o ETag forte para fraco.
+    """
+    if not if_none_match:
+        return False
+    candidates = {_opaque_tag(candidate.strip()) for candidate in if_none_match.split(',')}
+    return '*' in candidates or _opaque_tag(etag) in candidates
+
+
+class RenderedResponseCache:
+    """Corpos JSON já serializados por chave (ex.: user_id) e variante (parâmetros da consulta).
+
+    Cada corpo guarda seu ETag forte. invalidate(key) descarta todas as variantes da chave;
+    uma leitura que começou antes de uma invalidação não é guardada (ver begin()/put()).
+    """
+
+    def __init__(self, max_keys: int, ttl: float, max_variants: int = 32):
+        self.max_variants = max_variants
+        self._entries = TTLCache(max_keys, ttl)
+        self._version = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, variant: Hashable) -> Optional[Tuple[str, bytes, Dict[str, str]]]:
+        variants = self._entries.get(key)
+        if variants is None:
+            return None
+        rendered = variants.get(variant)
+        if rendered is None:
+            # Chave presente mas sem esta variante: conta como miss
+            self._entries.hits -= 1
+            self._entries.misses += 1
+        return rendered
+
+    def begin(self) -> int:
+        return self._version
+
+    def put(self, key: Hashable, variant: Hashable, body: bytes, headers: Dict[str, str],
+            version: int) -> Tuple[str, bytes, Dict[str, str]]:
+        rendered = (make_etag(body), body, headers)
+        if version != self._version:
+            return rendered
+        variants = self._entries.pop(key) or {}
+        if len(variants) >= self.max_variants:
+            variants.clear()
+        variants[variant] = rendered
+        self._entries.set(key, variants)
+        return rendered
+
+    def invalidate(self, key: Hashable):
+        self._version += 1
+        self.invalidations += 1
+        self._entries.pop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._entries.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
@@ -0,0 +1,111 @@
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Tuple
+
+# Um turno da conversa: (mensagem do usuário, resposta da IA)
+Turn = Tuple[str, str]
+
+
+def _turn_size(turn: Turn) -> int:
+    # Estimativa barata em bytes (UTF-8 ocupa ao menos 1 byte por caractere) mais o overhead da tupla
+    return len(turn[0]) + len(turn[1]) + 64
+
+
+class ChatContextCache:
+    """Últimos `max_turns` turnos de cada sessão de chat, em memória.
+
+    Cada sessão é um ring buffer (deque com maxlen): adicionar um turno descarta o mais
+    antigo, então montar o contexto não depende do tamanho do histórico. Na primeira vez
+    que uma sessão é pedida, os turnos recentes vêm do MySQL; cargas simultâneas da mesma
+    sessão compartilham uma única consulta. As sessões saem por LRU quando passam de
+    `max_sessions` ou quando o total estimado passa de `max_bytes`.
+    """
+
+    def __init__(self, client, max_turns: int = None, max_sessions: int = None, max_bytes: int = None):
+        self.client = client
+        self.max_turns = max_turns or int(os.getenv("CHAT_CONTEXT_TURNS", "20"))
+        self.max_sessions = max_sessions or int(os.getenv("CHAT_CONTEXT_MAX_SESSIONS", "10000"))
+        self.max_bytes = max_bytes or int(os.getenv("CHAT_CONTEXT_MAX_BYTES", str(64 * 1024 * 1024)))
+        self._sessions = OrderedDict()
+        self._sizes = {}
+        self._loading = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def _load(self, session_id: str) -> deque:
+        rows, _ = await self.client.find_page('chat_messages', {'session_id': session_id}, sort_column='timestamp',
+                                              limit=self.max_turns, columns=['message', 'response'])
+        # find_page devolve do mais novo para o mais antigo
+        return deque(((row['message'], row['response']) for row in reversed(rows)), maxlen=self.max_turns)
+
+    async def get(self, session_id: str) -> List[Turn]:
+        """Turnos recentes da sessão, do mais antigo para o mais novo"""
+        turns = self._sessions.get(session_id)
+        if turns is not None:
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            return list(turns)
+
+        self.misses += 1
+        loading = self._loading.get(session_id)
+        if loading is None:
+            loading = asyncio.ensure_future(self._load(session_id))
+            self._loading[session_id] = loading
+            try:
+                turns = await asyncio.shield(loading)
+            finally:
+                del self._loading[session_id]
+            self._store(session_id, turns)
+        else:
+            turns = await asyncio.shield(loading)
+        return list(self._sessions.get(session_id, turns))
+
+    def append(self, session_id: str, message: str, response: str):
+        """Registra um turno novo. Sessões fora do cache são ignoradas: o próximo get() carrega do banco."""
+        turns = self._sessions.get(session_id)
+        if turns is None:
+            return
+        turn = (message, response)
+        size = _turn_size(turn)
+        if len(turns) == turns.maxlen:
+            size -= _turn_size(turns[0])
+        turns.append(turn)
+        self._sizes[session_id] += size
+        self.bytes += size
+        self._sessions.move_to_end(session_id)
+        self._evict()
+
+    def _store(self, session_id: str, turns: deque):
+        size = sum(_turn_size(turn) for turn in turns)
+        self._sessions[session_id] = turns
+        self._sizes[session_id] = size
+        self.bytes += size
+        self._evict()
+
+    def _evict(self):
+        # Mantém ao menos a sessão mais recente, mesmo que sozinha passe do limite de memória
+        while len(self._sessions) > 1 and (len(self._sessions) > self.max_sessions or self.bytes > self.max_bytes):
+            session_id, _ = self._sessions.popitem(last=False)
+            self.bytes -= self._sizes.pop(session_id)
+            self.evictions += 1
+
+    def invalidate(self, session_id: str):
+        if self._sessions.pop(session_id, None) is not None:
+            self.bytes -= self._sizes.pop(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "max_turns": self.max_turns,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable
+
+from metrics import Histogram
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class PoolConfig:
+    """Parâmetros do pool de conexões, lidos do ambiente (MYSQL_POOL_*)"""
+
+    def __init__(self, name: str = "mypool", size: int = 5, max_overflow: int = 10,
+                 timeout: float = 30.0, recycle: int = 3600, pre_ping: bool = False,
+                 pre_ping_idle: float = 30.0):
+        self.name = name
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.recycle = recycle
+        # Cada PING é uma ida e volta a mais; com pre_ping, só conexões ociosas há mais de
+        # pre_ping_idle segundos são testadas antes de sair do pool
+        self.pre_ping = pre_ping
+        self.pre_ping_idle = pre_ping_idle
+
+    @property
+    def max_connections(self) -> int:
+        return self.size + self.max_overflow
+
+    @classmethod
+    def from_env(cls, name: str = "mypool") -> "PoolConfig":
+        return cls(
+            name=name,
+            size=int(os.getenv("MYSQL_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("MYSQL_POOL_MAX_OVERFLOW", "10")),
+            timeout=float(os.getenv("MYSQL_POOL_TIMEOUT", "30")),
+            recycle=int(os.getenv("MYSQL_POOL_RECYCLE", "3600")),
+            pre_ping=_env_bool("MYSQL_POOL_PRE_PING", False),
+            pre_ping_idle=float(os.getenv("MYSQL_POOL_PRE_PING_IDLE", "30")),
+        )
+
+
+class PoolStats:
+    """Contadores de um pool: espera, checkouts, timeouts e latência de aquisição"""
+
+    def __init__(self, config: PoolConfig):
+        self.config = config
+        self.waiters = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.discarded = 0
+        self.acquire_latency = Histogram()
+
+    def snapshot(self, in_use: int, idle: int) -> Dict[str, Any]:
+        return {
+            "pool": self.config.name,
+            "size": self.config.size,
+            "max_overflow": self.config.max_overflow,
+            "in_use": in_use,
+            "idle": idle,
+            "overflow": max(0, in_use + idle - self.config.size),
+            "waiters": self.waiters,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "discarded": self.discarded,
+            "acquire_latency_seconds": self.acquire_latency.snapshot(),
+        }
+
+
+class ConnectionPool:
+    """Pool síncrono que espera por conexões livres em vez de falhar na hora.
+
+    Mantém até `size` conexões ociosas e abre até `max_overflow` conexões extras sob pico,
+    fechadas ao serem devolvidas. Conexões mais velhas que `recycle` segundos são
+    reabertas e, com `pre_ping`, uma conexão que ficou ociosa mais de `pre_ping_idle`
+    segundos é testada com PING antes de ser entregue.
+    """
+
+    def __init__(self, connect: Callable[[], Any], config: PoolConfig):
+        self._connect = connect
+        self.config = config
+        self.stats = PoolStats(config)
+        self._idle = deque()
+        self._created_at = {}
+        self._idle_since = {}
+        self._in_use = 0
+        self._condition = threading.Condition()
+
+    def _open(self):
+        connection = self._connect()
+        self._created_at[id(connection)] = time.monotonic()
+        return connection
+
+    def _discard(self, connection):
+        self._created_at.pop(id(connection), None)
+        self._idle_since.pop(id(connection), None)
+        self.stats.discarded += 1
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, connection) -> bool:
+        now = time.monotonic()
+        age = now - self._created_at.get(id(connection), 0)
+        if self.config.recycle and age > self.config.recycle:
+            return False
+        idle = now - self._idle_since.get(id(connection), now)
+        if self.config.pre_ping and idle > self.config.pre_ping_idle:
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def get_connection(self, timeout: float = None):
+        timeout = self.config.timeout if timeout is None else timeout
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+
+        with self._condition:
+            self.stats.waiters += 1
+            try:
+                while not self._idle and self._in_use >= self.config.max_connections:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._condition.wait(remaining):
+                        if self._idle or self._in_use < self.config.max_connections:
+                            break
+                        self.stats.timeouts += 1
+                        raise PoolTimeout(
+                            f"Timed out after {timeout}s waiting for a connection from pool '{self.config.name}'"
+                        )
+            finally:
+                self.stats.waiters -= 1
+            connection = self._idle.pop() if self._idle else None
+            self._in_use += 1
+
+        # Ping, reciclagem e abertura de conexão acontecem fora do lock
+        try:
+            if connection is not None and not self._is_usable(connection):
+                self._discard(connection)
+                connection = None
+            if connection is None:
+                connection = self._open()
+        except Exception:
+            with self._condition:
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        self.stats.acquired += 1
+        self.stats.acquire_latency.observe(time.perf_counter() - started)
+        return connection
+
+    def release(self, connection):
+        with self._condition:
+            self._in_use -= 1
+            if len(self._idle) < self.config.size:
+                self._idle.append(connection)
+                self._idle_since[id(connection)] = time.monotonic()
+                connection = None
+            self._condition.notify()
+        # Conexão de overflow: fecha ao devolver
+        if connection is not None:
+            self._created_at.pop(id(connection), None)
+            self._idle_since.pop(id(connection), None)
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._condition:
+            return self.stats.snapshot(in_use=self._in_use, idle=len(self._idle))
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+        for connection in idle:
+            self._created_at.pop(id(connection), None)
+            self._idle_since.pop(id(connection), None)
+            try:
+                connection.close()
+            except Exception:
+                pass
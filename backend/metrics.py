@@ -0,0 +1,201 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Any, Callable, List, Sequence
+
+from query_profiler import describe, query_profiler
+
+# Limites (em segundos) usados por padrão nos histogramas de latência
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Histograma cumulativo simples (contagem, soma, máximo e buckets), seguro entre threads"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                buckets[str(bound)] = cumulative
+            buckets["+Inf"] = self.count
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 6),
+                "max": round(self.max, 6),
+                "buckets": buckets,
+            }
+
+
+# Exposição no formato texto do Prometheus (GET /metrics)
+
+# Linhas afetadas/retornadas por consulta
+ROW_COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _header(name: str, kind: str, help_text: str) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def render_histogram(name: str, snapshot: Dict[str, Any], label_names: Sequence[str] = (),
+                     label_values: Sequence[Any] = ()) -> List[str]:
+    """Linhas _bucket/_sum/_count de um Histogram.snapshot()"""
+    lines = []
+    for bound, count in snapshot["buckets"].items():
+        le = f'le="{bound}"'
+        lines.append(f"{name}_bucket{_labels(label_names, label_values, le)} {count}")
+    lines.append(f"{name}_sum{_labels(label_names, label_values)} {snapshot['sum']}")
+    lines.append(f"{name}_count{_labels(label_names, label_values)} {snapshot['count']}")
+    return lines
+
+
+def render_value(name: str, kind: str, help_text: str, value: float) -> List[str]:
+    return _header(name, kind, help_text) + [f"{name} {value}"]
+
+
+class LabeledHistogram:
+    """Um Histogram por combinação de labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values) -> Histogram:
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, Histogram(self.buckets))
+        return child
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, "histogram", self.help_text)
+        for values, child in list(self._children.items()):
+            lines.extend(render_histogram(self.name, child.snapshot(), self.label_names, values))
+        return lines
+
+
+class LabeledCounter:
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values, amount: float = 1):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = _header(self.name, "counter", self.help_text)
+        with self._lock:
+            items = list(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.label_names, values)} {value}" for values, value in items)
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def render(self) -> List[str]:
+        return render_value(self.name, "gauge", self.help_text, self.value)
+
+
+class Registry:
+    """Métricas registradas mais coletores (funções que devolvem linhas já formatadas)"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str],
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> LabeledHistogram:
+        metric = LabeledHistogram(name, help_text, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str]) -> LabeledCounter:
+        metric = LabeledCounter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        metric = Gauge(name, help_text)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# Consultas por formato ("SELECT workouts [user_id]", o mesmo resumo do query_profiler): poucas
+# séries por tabela e nenhum pedaço de SQL ou valor nos labels
+db_query_seconds = registry.histogram(
+    "db_query_duration_seconds", "Tempo de execução das consultas por formato", ("shape",))
+db_query_rows = registry.histogram(
+    "db_query_rows", "Linhas retornadas (SELECT) ou afetadas por consulta", ("shape",), ROW_COUNT_BUCKETS)
+
+
+def observe_query(query: str, params: Any, seconds: float, rows: int):
+    """Chamado pelos clientes MySQL após cada comando; também alimenta o query_profiler quando ligado"""
+    shape = describe(query)
+    db_query_seconds.labels(shape).observe(seconds)
+    db_query_rows.labels(shape).observe(max(rows, 0))
+    if query_profiler.active:
+        query_profiler.record(query, params, seconds, rows)
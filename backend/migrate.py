@@ -0,0 +1,357 @@
+"""
+Versioned MySQL migrations for the Zeni schema.
+
+Each migration runs once and is recorded in `schema_migrations`. The steps are also
+idempotent (they check information_schema before creating or dropping anything), so a
+run that stopped halfway can simply be repeated.
+
+    python migrate.py            # apply pending migrations and verify query plans
+    python migrate.py --status   # list applied / pending migrations
+    python migrate.py --explain  # only run EXPLAIN on the client's query shapes
+    python migrate.py --binary-uuids  # convert UUID keys now (binary mode enabled after 0003 ran)
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).parent / '.env')
+
+from mysql_client import mysql_client
+from sql_builder import select_sql, page_sql, update_sql, delete_sql
+from token_sweeper import PURGE_EXPIRED_SQL, PURGE_USED_SQL
+from uuids import uuid_codec
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+# Schema helpers
+
+def table_exists(table: str) -> bool:
+    row = mysql_client.execute_query(
+        "SELECT COUNT(*) AS total FROM information_schema.tables "
+        "WHERE table_schema = DATABASE() AND table_name = %s",
+        (table,), fetch_one=True,
+    )
+    return row['total'] > 0
+
+
+def index_exists(table: str, index: str) -> bool:
+    row = mysql_client.execute_query(
+        "SELECT COUNT(*) AS total FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+        (table, index), fetch_one=True,
+    )
+    return row['total'] > 0
+
+
+def create_index(table: str, index: str, columns: Tuple[str, ...], unique: bool = False):
+    if index_exists(table, index):
+        logger.info(f"Index {index} already exists on {table}")
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    mysql_client.execute_query(f"CREATE {kind} {index} ON {table} ({', '.join(columns)})")
+    logger.info(f"Created index {index} on {table}({', '.join(columns)})")
+
+
+def column_type(table: str, column: str) -> Optional[str]:
+    row = mysql_client.execute_query(
+        "SELECT DATA_TYPE AS data_type FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        (table, column), fetch_one=True,
+    )
+    return row['data_type'].lower() if row else None
+
+
+def column_length(table: str, column: str) -> Optional[int]:
+    row = mysql_client.execute_query(
+        "SELECT CHARACTER_MAXIMUM_LENGTH AS length FROM information_schema.columns "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s",
+        (table, column), fetch_one=True,
+    )
+    return row['length'] if row else None
+
+
+def constraint_exists(table: str, constraint: str) -> bool:
+    row = mysql_client.execute_query(
+        "SELECT COUNT(*) AS total FROM information_schema.table_constraints "
+        "WHERE table_schema = DATABASE() AND table_name = %s AND constraint_name = %s",
+        (table, constraint), fetch_one=True,
+    )
+    return row['total'] > 0
+
+
+def drop_index(table: str, index: str):
+    if not index_exists(table, index):
+        return
+    mysql_client.execute_query(f"DROP INDEX {index} ON {table}")
+    logger.info(f"Dropped index {index} on {table}")
+
+
+# Migrations
+
+def m0001_initial_schema():
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+            name VARCHAR(255) NOT NULL,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS status_checks (
+            id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+            client_name VARCHAR(255) NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS password_reset_tokens (
+            id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+            user_id CHAR(36) NOT NULL,
+            token VARCHAR(255) UNIQUE NOT NULL,
+            expires_at TIMESTAMP NOT NULL,
+            used BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+            session_id VARCHAR(255) NOT NULL,
+            user_id CHAR(36) NOT NULL,
+            message TEXT NOT NULL,
+            response TEXT NOT NULL,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS workouts (
+            id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
+            user_id CHAR(36) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            category VARCHAR(255) NOT NULL,
+            exercises JSON NOT NULL,
+            duration VARCHAR(255) NOT NULL,
+            difficulty VARCHAR(255) NOT NULL,
+            created_by_ai BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+        """,
+    ]
+    for sql in statements:
+        mysql_client.execute_query(sql)
+
+
+def m0002_composite_indexes():
+    # Paginated lists order by (time column, id); InnoDB appends the primary key to every index
+    create_index('chat_messages', 'idx_chat_messages_session_ts', ('session_id', 'timestamp'))
+    create_index('workouts', 'idx_workouts_user_created', ('user_id', 'created_at'))
+    create_index('status_checks', 'idx_status_checks_ts', ('timestamp',))
+    # Token lookups also filter on `used`
+    create_index('password_reset_tokens', 'idx_password_reset_tokens_token_used', ('token', 'used'))
+    create_index('password_reset_tokens', 'idx_password_reset_tokens_user_id', ('user_id',))
+    create_index('chat_messages', 'idx_chat_messages_user_id', ('user_id',))
+    # Prefixes of the composite indexes above, now redundant
+    drop_index('chat_messages', 'idx_chat_messages_session_id')
+    drop_index('workouts', 'idx_workouts_user_id')
+
+
+# UUID key columns per table; users.id is referenced by the user_id columns
+UUID_KEYS = {
+    'users': ('id',),
+    'status_checks': ('id',),
+    'password_reset_tokens': ('id', 'user_id'),
+    'chat_messages': ('id', 'user_id'),
+    'workouts': ('id', 'user_id'),
+}
+
+
+def m0003_binary_uuid_keys():
+    # Always registered so every environment sees the same version list; the conversion itself
+    # only runs with MYSQL_BINARY_UUIDS=true, the same switch the clients use to encode keys
+    if not uuid_codec.enabled:
+        logger.info("MYSQL_BINARY_UUIDS is off, keeping CHAR(36) keys")
+        return
+    convert_uuid_keys()
+
+
+def convert_uuid_keys():
+    # Foreign keys must go while the referenced and referencing columns change type
+    foreign_keys = mysql_client.execute_query(
+        "SELECT TABLE_NAME AS table_name, CONSTRAINT_NAME AS constraint_name "
+        "FROM information_schema.key_column_usage "
+        "WHERE table_schema = DATABASE() AND referenced_table_name = 'users'",
+        fetch_all=True,
+    )
+    for fk in foreign_keys:
+        mysql_client.execute_query(f"ALTER TABLE {fk['table_name']} DROP FOREIGN KEY {fk['constraint_name']}")
+        logger.info(f"Dropped foreign key {fk['constraint_name']} on {fk['table_name']}")
+
+    for table, columns in UUID_KEYS.items():
+        for column in columns:
+            data_type = column_type(table, column)
+            if data_type == 'binary' and column_length(table, column) == 16:
+                continue
+            # CHAR(36) -> VARBINARY(36) keeps the text bytes; a run that stopped after this step
+            # leaves a varbinary column that may already hold some packed values, so only rows
+            # still 36 bytes long are packed. UNHEX(REPLACE(...)) is UUID_TO_BIN without the swap
+            # flag (the ids are already time-ordered v7 and must match uuid.UUID.bytes) and also
+            # works on MariaDB, which has no UUID_TO_BIN.
+            if data_type != 'varbinary':
+                mysql_client.execute_query(f"ALTER TABLE {table} MODIFY {column} VARBINARY(36) NOT NULL")
+            mysql_client.execute_query(
+                f"UPDATE {table} SET {column} = UNHEX(REPLACE({column}, '-', '')) WHERE LENGTH({column}) = 36"
+            )
+            default = " DEFAULT (UNHEX(REPLACE(UUID(), '-', '')))" if column == 'id' else ""
+            mysql_client.execute_query(f"ALTER TABLE {table} MODIFY {column} BINARY(16) NOT NULL{default}")
+            logger.info(f"Converted {table}.{column} to BINARY(16)")
+
+    for table, columns in UUID_KEYS.items():
+        constraint = f"fk_{table}_user_id"
+        if 'user_id' in columns and not constraint_exists(table, constraint):
+            mysql_client.execute_query(
+                f"ALTER TABLE {table} ADD CONSTRAINT {constraint} "
+                f"FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE"
+            )
+            logger.info(f"Added foreign key {constraint} on {table}")
+
+
+def m0004_reset_token_expiry_indexes():
+    # The background sweeper deletes by expires_at and by used; without these both are full scans
+    create_index('password_reset_tokens', 'idx_password_reset_tokens_expires', ('expires_at',))
+    create_index('password_reset_tokens', 'idx_password_reset_tokens_used_expires', ('used', 'expires_at'))
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[], None]]] = [
+    (1, "initial_schema", m0001_initial_schema),
+    (2, "composite_indexes", m0002_composite_indexes),
+    (3, "binary_uuid_keys", m0003_binary_uuid_keys),
+    (4, "reset_token_expiry_indexes", m0004_reset_token_expiry_indexes),
+]
+
+
+# Runner
+
+def ensure_migrations_table():
+    mysql_client.execute_query(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def applied_versions() -> set:
+    rows = mysql_client.execute_query("SELECT version FROM schema_migrations", fetch_all=True)
+    return {row['version'] for row in rows}
+
+
+def migrate() -> int:
+    ensure_migrations_table()
+    done = applied_versions()
+    applied = 0
+    for version, name, apply in MIGRATIONS:
+        if version in done:
+            continue
+        logger.info(f"Applying migration {version:04d}_{name}")
+        apply()
+        mysql_client.execute_query(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name)
+        )
+        applied += 1
+    logger.info(f"{applied} migration(s) applied")
+    return applied
+
+
+def show_status():
+    ensure_migrations_table()
+    done = applied_versions()
+    for version, name, _ in MIGRATIONS:
+        state = "applied" if version in done else "pending"
+        print(f"{version:04d}_{name}: {state}")
+
+
+# Query plan verification
+
+# Query shapes the routes emit through MySQLClient/AsyncMySQLClient, with sample parameters
+def query_shapes() -> List[Tuple[str, str, tuple]]:
+    shapes = [
+        ("user by email (login/register)", select_sql('users', ('email',)), ('probe@example.com',)),
+        ("user by id", select_sql('users', ('id',)), ('probe',)),
+        ("reset token lookup", select_sql('password_reset_tokens', ('token', 'used'), greater_than=('expires_at',)),
+         ('probe', False, '2000-01-01 00:00:00')),
+        ("chat export", select_sql('chat_messages', ('session_id',), 'timestamp'), ('probe',)),
+        ("workout export", select_sql('workouts', ('user_id',), 'created_at'), ('probe',)),
+        ("user update", update_sql('users', ('password',)), ('x', 'probe')),
+        ("reset token update", update_sql('password_reset_tokens', ('used',)), (True, 'probe')),
+        ("user delete", delete_sql('users'), ('probe',)),
+        ("reset token sweep (expired)", PURGE_EXPIRED_SQL, ('2000-01-01 00:00:00', 500)),
+        ("reset token sweep (used)", PURGE_USED_SQL, (500,)),
+    ]
+    for descending in (False, True):
+        for has_cursor in (False, True):
+            cursor = ('2000-01-01 00:00:00', '2000-01-01 00:00:00', 'probe') if has_cursor else ()
+            label = f"{'desc' if descending else 'asc'}{' + cursor' if has_cursor else ''}"
+            shapes.append((f"chat history ({label})",
+                           page_sql('chat_messages', None, ('session_id',), 'timestamp', descending, has_cursor),
+                           ('probe',) + cursor + (51,)))
+            shapes.append((f"workout list ({label})",
+                           page_sql('workouts', None, ('user_id',), 'created_at', descending, has_cursor),
+                           ('probe',) + cursor + (51,)))
+    shapes.append(("status list", page_sql('status_checks', None, (), 'timestamp', True, False), (51,)))
+    return shapes
+
+
+def verify_query_plans() -> bool:
+    """Run EXPLAIN on every query shape; fail if any of them does a full table scan (type = ALL)"""
+    ok = True
+    for label, query, params in query_shapes():
+        plan = mysql_client.execute_query(f"EXPLAIN {query}", params, fetch_all=True)
+        scans = [row for row in plan if (row.get('type') or '').upper() == 'ALL']
+        if scans:
+            ok = False
+            tables = ', '.join(str(row.get('table')) for row in scans)
+            logger.error(f"Full table scan on {tables} for {label}: {query}")
+        else:
+            access = ', '.join(f"{row.get('table')}:{row.get('type')}/{row.get('key')}" for row in plan)
+            logger.info(f"OK {label}: {access}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply Zeni MySQL migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--explain", action="store_true", help="only verify query plans")
+    parser.add_argument("--binary-uuids", action="store_true",
+                        help="convert UUID keys to BINARY(16) even if 0003 was recorded with binary mode off")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        show_status()
+        return 0
+    if args.binary_uuids:
+        convert_uuid_keys()
+        return 0
+    if not args.explain:
+        migrate()
+    return 0 if verify_query_plans() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,115 +1,245 @@
 import mysql.connector
-from mysql.connector import Error, pooling
+from mysql.connector import Error
 import os
-import uuid
+import time
 from datetime import datetime
-from typing import Dict, Any, Optional, List
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Tuple, Iterator
 
+from sql_builder import (insert_many_params, insert_statement, row_insert_statement, rows_insert_statement,
+                         update_statement, delete_statement, select_statement, page_statement, page_result)
+from uuids import uuid_codec
+from db_pool import ConnectionPool, PoolConfig, PoolTimeout
+from metrics import observe_query
+from query_profiler import database_error
 
-class MySQLClient:
-    def __init__(self):
-        self.connection_pool = self._create_connection_pool()
 
-    def _create_connection_pool(self):
+def _run_statement(connection, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+    """Executa um comando numa conexão já emprestada, sem commit"""
+    started = time.perf_counter()
+    cursor = connection.cursor(dictionary=True, buffered=True)
+    try:
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
+        if fetch_one:
+            result = cursor.fetchone()
+            rows = 0 if result is None else 1
+        elif fetch_all:
+            result = cursor.fetchall()
+            rows = len(result)
+        else:
+            result = rows = cursor.rowcount
+    finally:
+        cursor.close()
+    observe_query(query, params, time.perf_counter() - started, rows)
+    return result
+
+
+def _run_many(connection, query: str, seq_params: List[tuple]) -> int:
+    """executemany sem commit; o conector reescreve INSERT ... VALUES em uma única instrução multi-linha"""
+    started = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        cursor.executemany(query, seq_params)
+        rowcount = cursor.rowcount
+    finally:
+        cursor.close()
+    observe_query(query, seq_params, time.perf_counter() - started, rowcount)
+    return rowcount
+
+
+class _RecordOperations:
+    """Operações CRUD sobre execute_query, compartilhadas pelo cliente e pelas transações"""
+
+    def execute_query(self, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+        raise NotImplementedError
+
+    def execute_many(self, query: str, seq_params: List[tuple]) -> int:
+        raise NotImplementedError
+
+    def create_record(self, table: str, data: Dict[str, Any]) -> str:
+        """Insere um registro na tabela e retorna o id"""
+        query, params, record_id = insert_statement(table, data)
+        self.execute_query(query, params)
+        return record_id
+
+    def create_records(self, table: str, rows: List[Dict[str, Any]], batch_size: int = 500) -> List[str]:
+        """Insere vários registros em INSERTs multi-linha (até batch_size por instrução) e retorna os ids"""
+        if not rows:
+            return []
+        columns, params, ids = insert_many_params(rows)
+        self.insert_rows(table, columns, params, batch_size)
+        return ids
+
+    def insert_row(self, table: str, columns: Tuple[str, ...], values: tuple) -> int:
+        """Insere uma linha já serializada (ver serializers.model_row), sem nova conversão"""
+        return self.execute_query(*row_insert_statement(table, columns, values))
+
+    def insert_rows(self, table: str, columns: Tuple[str, ...], rows: List[tuple], batch_size: int = 500) -> int:
+        """Insere linhas já serializadas em INSERTs multi-linha de até batch_size linhas"""
+        query, batches = rows_insert_statement(table, columns, rows, batch_size)
+        return sum(self.execute_many(query, batch) for batch in batches)
+
+    def update_record(self, table: str, record_id: str, update_data: Dict[str, Any]) -> int:
+        """Atualiza um registro pelo id, retorna número de linhas afetadas"""
+        return self.execute_query(*update_statement(table, record_id, update_data))
+
+    def delete_record(self, table: str, record_id: str) -> int:
+        """Deleta um registro pelo id, retorna número de linhas afetadas"""
+        return self.execute_query(*delete_statement(table, record_id))
+
+    def find_one(self, table: str, filter_dict: Dict[str, Any],
+                 greater_than: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Primeira linha com colunas iguais a filter_dict e, opcionalmente, maiores que greater_than"""
+        query, params = select_statement(table, filter_dict, greater_than=greater_than)
+        return uuid_codec.decode_row(self.execute_query(query, params, fetch_one=True))
+
+    def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        query, params = select_statement(table, filter_dict)
+        return uuid_codec.decode_rows(self.execute_query(query, params, fetch_all=True))
+
+    def find_page(self, table: str, filter_dict: Dict[str, Any] = None, sort_column: str = 'created_at',
+                  limit: int = 50, after: Optional[tuple] = None, columns: Optional[List[str]] = None,
+                  descending: bool = True) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+        """Busca uma página ordenada por (sort_column, id) a partir do cursor `after`.
+
+        Retorna as linhas e o cursor (valor de sort_column, id) da próxima página, ou None
+        quando não há mais linhas. Com `columns`, só essas colunas (mais sort_column e id) são lidas.
+        """
+        query, params = page_statement(table, filter_dict, sort_column, limit, after, columns, descending)
+        return page_result(self.execute_query(query, params, fetch_all=True), limit, sort_column)
+
+
+class Transaction(_RecordOperations):
+    """Unidade de trabalho: todos os comandos na mesma conexão, com um único commit no final"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute_query(self, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
+        try:
+            return _run_statement(self.connection, query, params, fetch_one, fetch_all)
+        except Error as e:
+            raise database_error(query, e) from e
+
+    def execute_many(self, query: str, seq_params: List[tuple]) -> int:
         try:
-            config = {
+            return _run_many(self.connection, query, seq_params)
+        except Error as e:
+            raise database_error(query, e) from e
+
+
+class MySQLClient(_RecordOperations):
+    def __init__(self, pool_config: PoolConfig = None):
+        self.connection_pool = self._create_connection_pool(pool_config or PoolConfig.from_env("mypool"))
+
+    def _create_connection_pool(self, pool_config: PoolConfig):
+        config = {
     "user": os.getenv("MYSQL_USER", "root"),
     "password": os.getenv("MYSQL_PASSWORD", "Pxdrinmv01!"),
     "host": os.getenv("MYSQL_HOST", "localhost"),
+    "port": int(os.getenv("MYSQL_PORT", "3306")),
     "database": os.getenv("MYSQL_DATABASE", "zeni_saas"),
-    "pool_name": "mypool",
-    "pool_size": 5
+    # Leituras não podem deixar snapshot aberto na conexão devolvida ao pool
+    "autocommit": True
 }
-            
-            return pooling.MySQLConnectionPool(**config)
-        except Error as e:
-            raise Exception(f"Error creating MySQL connection pool: {e}")
+
+        def connect():
+            try:
+                return mysql.connector.connect(**config)
+            except Error as e:
+                raise Exception(f"Error creating MySQL connection: {e}")
+
+        return ConnectionPool(connect, pool_config)
 
     def get_connection(self):
         try:
             return self.connection_pool.get_connection()
-        except Error as e:
+        except PoolTimeout as e:
             raise Exception(f"Error getting connection from pool: {e}")
 
+    def release_connection(self, connection):
+        self.connection_pool.release(connection)
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return self.connection_pool.snapshot()
+
     def execute_query(self, query: str, params: tuple = None, fetch_one=False, fetch_all=False):
         connection = None
-        cursor = None
         try:
             connection = self.get_connection()
-            cursor = connection.cursor(dictionary=True)
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-
-            if fetch_one:
-                return cursor.fetchone()
-            if fetch_all:
-                return cursor.fetchall()
-            
-            connection.commit()
-            return cursor.rowcount
+            result = _run_statement(connection, query, params, fetch_one, fetch_all)
+            if not (fetch_one or fetch_all):
+                connection.commit()
+            return result
 
         except Error as e:
             if connection:
                 connection.rollback()
-            raise Exception(f"Database error: {e}")
+            raise database_error(query, e) from e
         finally:
-            if cursor:
-                cursor.close()
             if connection:
-                connection.close()
+                self.release_connection(connection)
 
-    def create_record(self, table: str, data: Dict[str, Any]) -> str:
-        """Insere um registro na tabela e retorna o id"""
-        if 'id' not in data:
-            data['id'] = str(uuid.uuid4())
-        # Converte datetime para string (se houver)
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
-
-        columns = ', '.join(data.keys())
-        placeholders = ', '.join(['%s'] * len(data))
-        query = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-
-        self.execute_query(query, tuple(data.values()))
-        return data['id']
-
-    def update_record(self, table: str, record_id: str, update_data: Dict[str, Any]) -> int:
-        """Atualiza um registro pelo id, retorna número de linhas afetadas"""
-        if not update_data:
-            raise Exception("Nenhum dado para atualizar fornecido")
-
-        for key, value in update_data.items():
-            if isinstance(value, datetime):
-                update_data[key] = value.isoformat()
-
-        set_clause = ', '.join([f"{k} = %s" for k in update_data.keys()])
-        query = f"UPDATE {table} SET {set_clause} WHERE id = %s"
-        params = tuple(update_data.values()) + (record_id,)
+    def execute_many(self, query: str, seq_params: List[tuple]) -> int:
+        connection = None
+        try:
+            connection = self.get_connection()
+            rowcount = _run_many(connection, query, seq_params)
+            connection.commit()
+            return rowcount
 
-        return self.execute_query(query, params)
+        except Error as e:
+            if connection:
+                connection.rollback()
+            raise database_error(query, e) from e
+        finally:
+            if connection:
+                self.release_connection(connection)
 
-    def delete_record(self, table: str, record_id: str) -> int:
-        """Deleta um registro pelo id, retorna número de linhas afetadas"""
-        query = f"DELETE FROM {table} WHERE id = %s"
-        return self.execute_query(query, (record_id,))
+    def iter_all(self, table: str, filter_dict: Dict[str, Any] = None, batch_size: int = 500,
+                 order_by: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre as linhas com cursor não bufferizado, trazendo batch_size por vez.
 
-    def find_one(self, table: str, filter_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-        query = f"SELECT * FROM {table} WHERE {where_clause}"
-        return self.execute_query(query, tuple(filter_dict.values()), fetch_one=True)
+        A memória usada não depende do total de linhas; a conexão fica emprestada até o fim da iteração.
+        """
+        query, params = select_statement(table, filter_dict, order_by)
+        connection = self.get_connection()
+        cursor = None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield uuid_codec.decode_row(row)
+        except Error as e:
+            raise database_error(query, e) from e
+        finally:
+            if cursor:
+                # Descarta o que não foi lido para a conexão voltar limpa ao pool
+                connection.consume_results()
+                cursor.close()
+            self.release_connection(connection)
 
-    def find_all(self, table: str, filter_dict: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        if filter_dict:
-            where_clause = ' AND '.join([f"{k} = %s" for k in filter_dict.keys()])
-            query = f"SELECT * FROM {table} WHERE {where_clause}"
-            params = tuple(filter_dict.values())
-        else:
-            query = f"SELECT * FROM {table}"
-            params = None
-        return self.execute_query(query, params, fetch_all=True)
+    @contextmanager
+    def transaction(self):
+        """Fixa uma conexão para vários comandos; commit ao sair, rollback em caso de erro"""
+        connection = self.get_connection()
+        try:
+            connection.start_transaction()
+            yield Transaction(connection)
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self.release_connection(connection)
 
 
 # Cria instância global
@@ -0,0 +1,89 @@
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+import bcrypt
+
+from metrics import Histogram
+
+
+class PasswordHasherBusy(Exception):
+    """Fila de hashing cheia; o cliente deve tentar novamente depois de retry_after segundos"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Password hashing queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Executa bcrypt fora do event loop, num pool de threads limitado ao número de núcleos.
+
+    O bcrypt libera o GIL durante o hash, então threads bastam para usar todos os núcleos.
+    Quando há mais de `workers + max_queue` pedidos em andamento, novos pedidos são
+    recusados com PasswordHasherBusy em vez de acumular latência.
+    """
+
+    def __init__(self, workers: int = None, max_queue: int = None):
+        self.workers = workers or int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+        self.max_queue = max_queue if max_queue is not None else int(
+            os.getenv("PASSWORD_HASH_MAX_QUEUE", self.workers * 8)
+        )
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        # Só é alterado no event loop, dispensa lock
+        self.in_flight = 0
+        self.rejected = 0
+        self.queue_wait = Histogram()
+        self.hash_time = Histogram()
+
+    def retry_after(self) -> int:
+        # Estimativa de quanto tempo a fila atual leva para esvaziar
+        per_job = self.hash_time.mean or 0.25
+        return max(1, math.ceil(self.in_flight * per_job / self.workers))
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy(self.retry_after())
+
+        enqueued_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            self.queue_wait.observe(started_at - enqueued_at)
+            try:
+                return fn(*args)
+            finally:
+                self.hash_time.observe(time.perf_counter() - started_at)
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, job)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode(), bcrypt.gensalt())
+        return hashed.decode()
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode(), hashed.encode())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+            "queue_wait_seconds": self.queue_wait.snapshot(),
+            "hash_seconds": self.hash_time.snapshot(),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Cria instância global
+password_hasher = PasswordHasher()
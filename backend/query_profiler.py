@@ -0,0 +1,175 @@
+import logging
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("slow_query")
+
+_TABLE_PATTERNS = (
+    re.compile(r'\bFROM\s+`?(\w+)', re.IGNORECASE),
+    re.compile(r'\bINTO\s+`?(\w+)', re.IGNORECASE),
+    re.compile(r'^\s*UPDATE\s+`?(\w+)', re.IGNORECASE),
+    re.compile(r'\bTABLE\s+`?(\w+)', re.IGNORECASE),
+)
+_FILTER_PATTERN = re.compile(r'`?(\w+)`?\s*(?:=|<>|!=|>=|<=|>|<|\bIN\b|\bLIKE\b|\bIS\b)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def describe(query: str) -> str:
+    """Formato da consulta: operação, tabela e colunas filtradas, ex. "SELECT workouts [user_id]" """
+    words = query.split(None, 1)
+    operation = words[0].upper() if words else "?"
+    table = next((match.group(1) for pattern in _TABLE_PATTERNS for match in [pattern.search(query)] if match), "?")
+    filters = []
+    where = re.split(r'\bWHERE\b', query, maxsplit=1, flags=re.IGNORECASE)
+    if len(where) == 2:
+        clause = re.split(r'\b(?:ORDER\s+BY|GROUP\s+BY|LIMIT)\b', where[1], maxsplit=1, flags=re.IGNORECASE)[0]
+        filters = list(dict.fromkeys(column.lower() for column in _FILTER_PATTERN.findall(clause)
+                                     if column.upper() not in ("AND", "OR", "NOT")))
+    return f"{operation} {table} [{', '.join(filters)}]"
+
+
+def redact(value: Any) -> str:
+    """Só o tipo (e o tamanho de textos/bytes) de um parâmetro; o valor nunca vai para o log"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, (str, bytes, bytearray)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def _env_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+class _ShapeStats:
+    __slots__ = ("count", "errors", "total", "max", "rows")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+
+
+class QueryProfiler:
+    """Agrega tempo por formato de consulta e registra consultas lentas.
+
+    Desligado por padrão: com QUERY_PROFILER_ENABLED=true cada consulta soma contagem, tempo
+    total/máximo e linhas ao seu formato (ver describe()). Com SLOW_QUERY_THRESHOLD_MS, as
+    consultas acima do limite vão para o logger "slow_query" e para as últimas `max_slow`
+    entradas, sempre com os parâmetros redigidos. Os dois podem ser ligados independentemente.
+    """
+
+    def __init__(self, enabled: bool = None, slow_threshold_ms: float = None, max_shapes: int = None,
+                 max_slow: int = None):
+        if enabled is None:
+            enabled = os.getenv("QUERY_PROFILER_ENABLED", "false").lower() in ("1", "true", "yes", "on")
+        self.enabled = enabled
+        self.slow_threshold_ms = slow_threshold_ms if slow_threshold_ms is not None else _env_float("SLOW_QUERY_THRESHOLD_MS")
+        self.max_shapes = max_shapes or int(os.getenv("QUERY_PROFILER_MAX_SHAPES", "500"))
+        self._shapes = {}
+        self._slow = deque(maxlen=max_slow or int(os.getenv("SLOW_QUERY_LOG_SIZE", "100")))
+        self._lock = threading.Lock()
+        self.dropped_shapes = 0
+
+    @property
+    def active(self) -> bool:
+        return self.enabled or self.slow_threshold_ms is not None
+
+    def _shape_stats(self, shape: str) -> Optional[_ShapeStats]:
+        stats = self._shapes.get(shape)
+        if stats is None:
+            if len(self._shapes) >= self.max_shapes:
+                self.dropped_shapes += 1
+                return None
+            stats = self._shapes[shape] = _ShapeStats()
+        return stats
+
+    def record(self, query: str, params: Any, seconds: float, rows: int):
+        if self.enabled:
+            with self._lock:
+                stats = self._shape_stats(describe(query))
+                if stats is not None:
+                    stats.count += 1
+                    stats.total += seconds
+                    stats.rows += max(rows, 0)
+                    if seconds > stats.max:
+                        stats.max = seconds
+
+        if self.slow_threshold_ms is not None and seconds * 1000 >= self.slow_threshold_ms:
+            if params and isinstance(params[0], (tuple, list)):
+                # executemany: só o número de linhas e o formato da primeira
+                redacted = f"{len(params)} rows of ({', '.join(redact(value) for value in params[0])})"
+            else:
+                redacted = f"({', '.join(redact(value) for value in params or ())})"
+            entry = {
+                "at": datetime.utcnow().isoformat(),
+                "shape": describe(query),
+                "duration_ms": round(seconds * 1000, 3),
+                "rows": rows,
+                "query": ' '.join(query.split()),
+                "params": redacted,
+            }
+            self._slow.append(entry)
+            logger.warning("Slow query %.1fms %s rows=%d params=%s: %s",
+                           entry["duration_ms"], entry["shape"], rows, redacted, entry["query"])
+
+    def record_error(self, query: str):
+        if self.enabled:
+            with self._lock:
+                stats = self._shape_stats(describe(query))
+                if stats is not None:
+                    stats.errors += 1
+
+    def top(self, limit: int = 20, sort: str = "total") -> List[Dict[str, Any]]:
+        with self._lock:
+            items: List[Tuple[str, _ShapeStats]] = list(self._shapes.items())
+        shapes = [
+            {
+                "shape": shape,
+                "count": stats.count,
+                "errors": stats.errors,
+                "total_ms": round(stats.total * 1000, 3),
+                "mean_ms": round(stats.total / stats.count * 1000, 3) if stats.count else 0.0,
+                "max_ms": round(stats.max * 1000, 3),
+                "rows": stats.rows,
+            }
+            for shape, stats in items
+        ]
+        key = {"total": "total_ms", "max": "max_ms", "mean": "mean_ms", "count": "count", "rows": "rows"}.get(sort, "total_ms")
+        shapes.sort(key=lambda item: item[key], reverse=True)
+        return shapes[:limit]
+
+    def slow_queries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return list(self._slow)[-limit:][::-1]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self._slow.clear()
+            self.dropped_shapes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "tracked_shapes": len(self._shapes),
+            "max_shapes": self.max_shapes,
+            "dropped_shapes": self.dropped_shapes,
+        }
+
+
+query_profiler = QueryProfiler()
+
+
+def database_error(query: str, error: Exception) -> Exception:
+    """Erro do driver para os clientes MySQL: conta no formato da consulta e leva o formato na mensagem"""
+    query_profiler.record_error(query)
+    return Exception(f"Database error in {describe(query)}: {error}")
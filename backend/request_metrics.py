@@ -0,0 +1,61 @@
+import time
+
+from metrics import registry
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("method", "route"))
+http_responses = registry.counter(
+    "http_responses_total", "Respostas HTTP por rota e status", ("method", "route", "status"))
+http_in_flight = registry.gauge("http_requests_in_flight", "Requisições HTTP em andamento")
+
+
+# Template da rota por endpoint, preenchido na primeira requisição de cada um
+_templates = {}
+
+
+def _route_template(scope) -> str:
+    # O roteador grava o endpoint encontrado no scope; o template evita um label por id
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    template = _templates.get(endpoint)
+    if template is None:
+        template = next((route.path for route in getattr(scope.get("app"), "routes", ())
+                         if getattr(route, "endpoint", None) is endpoint), "unmatched")
+        _templates[endpoint] = template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """Middleware ASGI que mede cada requisição HTTP até o último byte da resposta.
+
+    Registra latência por (método, rota), contagem por status e o número de requisições
+    em andamento. A rota é o template ("/api/workouts/{user_id}"), não o caminho real.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_in_flight.dec()
+            route = _route_template(scope)
+            method = scope["method"]
+            http_request_seconds.labels(method, route).observe(time.perf_counter() - started)
+            http_responses.inc(method, route, str(status))
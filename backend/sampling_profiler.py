@@ -0,0 +1,119 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+
+class ProfilerBusy(Exception):
+    """Já existe uma coleta em andamento"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> List[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+class SamplingProfiler:
+    """Profiler por amostragem ligado sob demanda, sem reiniciar o servidor.
+
+    Durante a coleta, uma thread lê a pilha de todas as threads (event loop, pool do bcrypt,
+    threads do executor) a cada `interval` segundos e, com `include_tasks`, também a pilha
+    das tasks asyncio suspensas, que não aparecem em nenhuma thread. O resultado está no
+    formato "collapsed" (uma pilha por linha, frames separados por ';' e a contagem no fim),
+    aceito por flamegraph.pl, speedscope e inferno.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Thread própria: a coleta não disputa o executor padrão, que pode ser justamente o gargalo
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sampling-profiler")
+        self.running = False
+        self.runs = 0
+        self.last_run = None
+
+    def _sample_tasks(self, loop: asyncio.AbstractEventLoop, stacks: Counter):
+        try:
+            tasks = asyncio.all_tasks(loop)
+        except RuntimeError:
+            return
+        for task in tasks:
+            if task.done():
+                continue
+            # task.get_stack() de uma task suspensa traz só o frame mais externo; segue a cadeia de awaits
+            labels = []
+            coroutine = task.get_coro()
+            while coroutine is not None:
+                frame = getattr(coroutine, "cr_frame", None) or getattr(coroutine, "ag_frame", None)
+                if frame is None:
+                    break
+                labels.append(_frame_label(frame))
+                coroutine = getattr(coroutine, "cr_await", None) or getattr(coroutine, "ag_await", None)
+            if labels:
+                stacks[";".join([f"task:{task.get_name()}", *labels])] += 1
+
+    def _collect(self, duration: float, interval: float, include_tasks: bool, loop) -> Dict[str, Any]:
+        stacks = Counter()
+        own_ident = threading.get_ident()
+        samples = 0
+        deadline = time.monotonic() + duration
+        try:
+            while time.monotonic() < deadline:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own_ident:
+                        continue
+                    stacks[";".join([f"thread:{names.get(ident, ident)}", *_stack(frame)])] += 1
+                if include_tasks and loop is not None:
+                    self._sample_tasks(loop, stacks)
+                samples += 1
+                time.sleep(interval)
+        finally:
+            # Só a thread de coleta libera a vaga: se a requisição for cancelada, a amostragem
+            # continua até o fim e uma nova coleta não pode começar em paralelo
+            self.running = False
+        return {"samples": samples, "stacks": stacks}
+
+    async def profile(self, duration: float, interval: float = 0.01, include_tasks: bool = True) -> Dict[str, Any]:
+        """Coleta por `duration` segundos sem bloquear o event loop; devolve amostras e texto collapsed"""
+        with self._lock:
+            if self.running:
+                raise ProfilerBusy("A profiling run is already in progress")
+            self.running = True
+        started_at = time.time()
+        try:
+            loop = asyncio.get_running_loop()
+            collecting = loop.run_in_executor(self._executor, self._collect, duration, interval, include_tasks, loop)
+        except BaseException:
+            # A coleta nem chegou à thread, então ninguém mais vai liberar a vaga
+            self.running = False
+            raise
+        result = await collecting
+        collapsed = "\n".join(f"{stack} {count}" for stack, count in result["stacks"].most_common())
+        self.runs += 1
+        self.last_run = {
+            "started_at": started_at,
+            "duration_seconds": duration,
+            "interval_seconds": interval,
+            "samples": result["samples"],
+            "distinct_stacks": len(result["stacks"]),
+        }
+        return {**self.last_run, "collapsed": collapsed + "\n" if collapsed else ""}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": self.running, "runs": self.runs, "last_run": self.last_run}
+
+
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,86 @@
+import typing
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+# Conversores aplicados a cada campo ao montar os parâmetros do INSERT
+
+
+def _datetime_to_db(value: Optional[datetime]):
+    return value.isoformat() if value is not None else None
+
+
+def _json_to_db(value: Any):
+    # Colunas JSON precisam de texto; bytes seriam enviados com charset binário
+    return orjson.dumps(value).decode() if value is not None else None
+
+
+def _unwrap_optional(annotation):
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _converter_for(annotation) -> Optional[Callable[[Any], Any]]:
+    annotation = _unwrap_optional(annotation)
+    if annotation is datetime:
+        return _datetime_to_db
+    if annotation in (list, dict) or typing.get_origin(annotation) in (list, dict):
+        return _json_to_db
+    return None
+
+
+@lru_cache(maxsize=None)
+def column_plan(model_class: Type[BaseModel]) -> Tuple[Tuple[str, ...], Tuple[Optional[Callable[[Any], Any]], ...]]:
+    """Colunas do modelo (na ordem de declaração) e o conversor de cada uma, calculados uma vez por classe"""
+    columns = tuple(model_class.model_fields)
+    converters = tuple(_converter_for(field.annotation) for field in model_class.model_fields.values())
+    return columns, converters
+
+
+def model_row(model: BaseModel) -> Tuple[Tuple[str, ...], tuple]:
+    """Converte um modelo em (colunas, valores) prontos para insert_row, numa única passada"""
+    columns, converters = column_plan(type(model))
+    values = model.__dict__
+    return columns, tuple(
+        convert(values[column]) if convert else values[column]
+        for column, convert in zip(columns, converters)
+    )
+
+
+# Respostas JSON: orjson serializa dicts do banco, datetime e modelos Pydantic direto,
+# sem o passo intermediário do jsonable_encoder
+
+
+def _json_default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+
+def json_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def raw_json_columns(row: Dict[str, Any], columns: Tuple[str, ...]) -> Dict[str, Any]:
+    """Marca colunas JSON lidas do banco como JSON já pronto: vão para a resposta sem decode/re-encode"""
+    for column in columns:
+        value = row.get(column)
+        if isinstance(value, bytearray):
+            value = bytes(value)
+        if isinstance(value, (str, bytes)):
+            row[column] = orjson.Fragment(value)
+    return row
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse renderizado com orjson; devolvida direto pelas rotas, também pula o jsonable_encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
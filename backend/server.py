@@ -1,26 +1,67 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Request, Response, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
-import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional
-import uuid
 from datetime import datetime, timedelta
 import secrets
-import bcrypt
-from mysql_client import mysql_client
+import base64
+import json
 
 ROOT_DIR = Path(__file__).parent
+# Antes dos módulos locais: pool, hasher e caches leem o ambiente ao serem importados
 load_dotenv(ROOT_DIR / '.env')
 
-app = FastAPI()
+from async_mysql_client import async_mysql_client as mysql_client
+from password_hasher import password_hasher, PasswordHasherBusy
+from write_buffer import WriteBehindBuffer
+from user_cache import UserCache
+from token_sweeper import ResetTokenSweeper
+from chat_context import ChatContextCache
+from ai_engine import AIResponder, AIResponseTimeout
+from workout_plan_cache import WorkoutPlanCache, plan_spec
+from metrics import registry, render_histogram, render_value
+from request_metrics import RequestMetricsMiddleware
+from query_profiler import query_profiler
+from sampling_profiler import sampling_profiler, ProfilerBusy
+from cache import RenderedResponseCache, etag_matches
+from uuids import uuid7
+from serializers import model_row, json_dumps, raw_json_columns, FastJSONResponse
+
+app = FastAPI(default_response_class=FastJSONResponse)
 api_router = APIRouter(prefix="/api")
 
+# Gravação em lote de chat_messages e status_checks (ativada com WRITE_BEHIND_ENABLED=true)
+write_buffer = WriteBehindBuffer(mysql_client)
+
+# Cache de usuários por email/id, invalidado em updates/deletes de `users`
+user_cache = UserCache(mysql_client)
+
+# Respostas de GET /workouts/{user_id} já serializadas, com ETag; invalidadas por POST /workouts
+workout_list_cache = RenderedResponseCache(
+    max_keys=int(os.getenv("WORKOUT_CACHE_MAX_USERS", "5000")),
+    ttl=float(os.getenv("WORKOUT_CACHE_TTL", "300")),
+)
+mysql_client.add_change_listener('users', workout_list_cache.invalidate)
+
+# Últimos turnos de cada sessão de chat, usados como contexto da resposta
+chat_context = ChatContextCache(mysql_client)
+
+# Motor de respostas do chat (AI_ENGINE; "stub" por padrão), com timeout e limite de concorrência
+ai_responder = AIResponder()
+
+# Planos gerados pela IA por (categoria, dificuldade, duração, restrições) normalizados
+workout_plan_cache = WorkoutPlanCache()
+
+# Remove periodicamente tokens de recuperação usados ou expirados (RESET_TOKEN_SWEEP_INTERVAL=0 desativa)
+reset_token_sweeper = ResetTokenSweeper(mysql_client)
+
 # Models
 class StatusCheck(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     client_name: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
 
@@ -28,7 +69,7 @@ class StatusCheckCreate(BaseModel):
     client_name: str
 
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     name: str
     email: str
     password: str
@@ -57,7 +98,7 @@ class ResetPasswordRequest(BaseModel):
     confirm_password: str
 
 class PasswordResetToken(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     user_id: str
     token: str
     expires_at: datetime
@@ -65,7 +106,7 @@ class PasswordResetToken(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class ChatMessage(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     session_id: str
     user_id: str
     message: str
@@ -78,7 +119,7 @@ class ChatRequest(BaseModel):
     message: str
 
 class WorkoutPlan(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7)
     user_id: str
     title: str
     category: str
@@ -88,16 +129,58 @@ class WorkoutPlan(BaseModel):
     created_by_ai: bool = False
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class WorkoutPlanRequest(BaseModel):
+    user_id: str
+    category: str
+    difficulty: str
+    duration: str
+    constraints: List[str] = []
+
 # Helpers
-def convert_datetime_to_string(obj):
-    if isinstance(obj, dict):
-        return {k: convert_datetime_to_string(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        import json
-        return json.dumps(obj)
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    return obj
+# Paginação por keyset: o cursor é (valor da coluna de ordenação, id) em base64
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(after):
+    if after is None:
+        return None
+    value, record_id = after
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, record_id]).encode()).decode()
+
+def decode_cursor(cursor: Optional[str]):
+    if not cursor:
+        return None
+    try:
+        value, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return value, record_id
+
+def parse_fields(fields: Optional[str], model) -> Optional[List[str]]:
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(',') if f.strip()]
+    invalid = set(requested) - set(model.model_fields)
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos: {', '.join(sorted(invalid))}")
+    return requested
+
+def page_response(rows, after) -> FastJSONResponse:
+    """Página de linhas do banco serializada direto com orjson, com o cursor da próxima em X-Next-Cursor"""
+    next_cursor = encode_cursor(after)
+    return FastJSONResponse(rows, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+async def stream_ndjson(rows, json_columns=()):
+    async for row in rows:
+        yield json_dumps(raw_json_columns(row, json_columns)) + b"\n"
+
+def sse_event(data, event: Optional[str] = None) -> bytes:
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + json_dumps(data) + b"\n\n"
+
+# Colunas JSON de workouts: o texto guardado no MySQL vai direto para a resposta
+WORKOUT_JSON_COLUMNS = ('exercises',)
 
 # Routes
 @api_router.get("/")
@@ -107,40 +190,40 @@ async def root():
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_obj = StatusCheck(**input.dict())
-    status_data = convert_datetime_to_string(status_obj.dict())
-    mysql_client.create_record('status_checks', status_data)
+    await write_buffer.write('status_checks', *model_row(status_obj))
     return status_obj
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    data = mysql_client.find_all('status_checks')
-    return [StatusCheck(**item) for item in data]
-
-import bcrypt
+async def get_status_checks(limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
+    data, after = await mysql_client.find_page('status_checks', sort_column='timestamp', limit=limit,
+                                               after=decode_cursor(cursor))
+    # As linhas já têm exatamente os campos de StatusCheck
+    return page_response(data, after)
 
 @api_router.post("/register")
 async def register(user_data: UserCreate):
-    existing_user = mysql_client.find_one('users', {'email': user_data.email})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email já cadastrado")
-
-    hashed_password = bcrypt.hashpw(user_data.password.encode(), bcrypt.gensalt()).decode()
-    user = User(**user_data.dict(), password=hashed_password)
-    user_data_dict = convert_datetime_to_string(user.dict())
-
-    user_id = mysql_client.create_record('users', user_data_dict)
-    return {"message": "Usuário criado com sucesso", "user_id": user_id, "name": user.name}
+    # Hash fora da transação para não prender a conexão durante o bcrypt
+    hashed_password = await password_hasher.hash(user_data.password)
+    user = User(**user_data.dict(exclude={'password'}), password=hashed_password)
+    columns, values = model_row(user)
+
+    async with mysql_client.transaction() as tx:
+        existing_user = await tx.find_one('users', {'email': user_data.email})
+        if existing_user:
+            raise HTTPException(status_code=400, detail="Email já cadastrado")
+        await tx.insert_row('users', columns, values)
+    return {"message": "Usuário criado com sucesso", "user_id": user.id, "name": user.name}
 
 @api_router.post("/login")
 async def login(login_data: UserLogin):
-    user = mysql_client.find_one('users', {'email': login_data.email})
-    if not user or not bcrypt.checkpw(login_data.password.encode(), user['password'].encode()):
+    user = await user_cache.find_by_email(login_data.email)
+    if not user or not await password_hasher.verify(login_data.password, user['password']):
         raise HTTPException(status_code=401, detail="Email ou senha incorretos")
     return {"message": "Login realizado com sucesso", "user_id": user['id'], "name": user['name']}
 
 @api_router.put("/users/update")
 async def update_user(user_update: UserUpdate):
-    user = mysql_client.find_one('users', {'email': user_update.email})
+    user = await user_cache.find_by_email(user_update.email)
     if not user:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
 
@@ -148,30 +231,30 @@ async def update_user(user_update: UserUpdate):
     if user_update.name:
         updates['name'] = user_update.name
     if user_update.password:
-        updates['password'] = bcrypt.hashpw(user_update.password.encode(), bcrypt.gensalt()).decode()
+        updates['password'] = await password_hasher.hash(user_update.password)
 
     if not updates:
         raise HTTPException(status_code=400, detail="Nada para atualizar")
 
-    mysql_client.update_record('users', user['id'], updates)
+    await mysql_client.update_record('users', user['id'], updates)
     return {"message": "Usuário atualizado com sucesso"}
 
 @api_router.delete("/users/{user_id}")
 async def delete_user(user_id: str):
-    deleted = mysql_client.delete_record('users', user_id)
+    deleted = await mysql_client.delete_record('users', user_id)
     if deleted == 0:
         raise HTTPException(status_code=404, detail="Usuário não encontrado")
     return {"message": "Usuário excluído com sucesso"}
 
 @api_router.post("/forgot-password")
 async def forgot_password(request: ForgotPasswordRequest):
-    user = mysql_client.find_one('users', {'email': request.email})
+    user = await user_cache.find_by_email(request.email)
     if not user:
         return {"message": "Se o email estiver cadastrado, você receberá um link de recuperação"}
     reset_token = secrets.token_urlsafe(32)
     expires_at = datetime.utcnow() + timedelta(hours=1)
     token_data = PasswordResetToken(user_id=user['id'], token=reset_token, expires_at=expires_at)
-    mysql_client.create_record('password_reset_tokens', convert_datetime_to_string(token_data.dict()))
+    await mysql_client.insert_row('password_reset_tokens', *model_row(token_data))
     reset_link = f"http://localhost:3000/reset-password?token={reset_token}"
     return {"message": "Se o email estiver cadastrado, você receberá um link de recuperação", "reset_link": reset_link}
 
@@ -179,50 +262,245 @@ async def forgot_password(request: ForgotPasswordRequest):
 async def reset_password(request: ResetPasswordRequest):
     if request.new_password != request.confirm_password:
         raise HTTPException(status_code=400, detail="As senhas não coincidem")
-    token = mysql_client.find_one('password_reset_tokens', {'token': request.token, 'used': False})
-    if not token:
-        raise HTTPException(status_code=400, detail="Token inválido ou expirado")
-    expires_at = token['expires_at']
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-    if expires_at < datetime.utcnow():
-        raise HTTPException(status_code=400, detail="Token expirado")
-    hashed_pw = bcrypt.hashpw(request.new_password.encode(), bcrypt.gensalt()).decode()
-    mysql_client.update_record('users', token['user_id'], {'password': hashed_pw})
-    mysql_client.update_record('password_reset_tokens', token['id'], {'used': True})
+    # Hash fora da transação para não prender a conexão durante o bcrypt
+    hashed_pw = await password_hasher.hash(request.new_password)
+    async with mysql_client.transaction() as tx:
+        # Expiração filtrada no próprio SELECT (índice em token)
+        token = await tx.find_one('password_reset_tokens', {'token': request.token, 'used': False},
+                                  greater_than={'expires_at': datetime.utcnow()})
+        if not token:
+            raise HTTPException(status_code=400, detail="Token inválido ou expirado")
+        await tx.update_record('users', token['user_id'], {'password': hashed_pw})
+        await tx.update_record('password_reset_tokens', token['id'], {'used': True})
     return {"message": "Senha alterada com sucesso"}
 
 @api_router.get("/validate-reset-token/{token}")
 async def validate_reset_token(token: str):
-    token_data = mysql_client.find_one('password_reset_tokens', {'token': token, 'used': False})
+    token_data = await mysql_client.find_one('password_reset_tokens', {'token': token, 'used': False},
+                                             greater_than={'expires_at': datetime.utcnow()})
     if not token_data:
-        raise HTTPException(status_code=400, detail="Token inválido")
-    expires_at = token_data['expires_at']
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-    if expires_at < datetime.utcnow():
-        raise HTTPException(status_code=400, detail="Token expirado")
+        raise HTTPException(status_code=400, detail="Token inválido ou expirado")
     return {"message": "Token válido"}
 
 @api_router.post("/chat")
 async def chat_with_ai(chat_request: ChatRequest):
-    response = f"Resposta da IA para: {chat_request.message}"
+    context = await chat_context.get(chat_request.session_id)
+    response = await ai_responder.respond(chat_request.message, context)
     chat_message = ChatMessage(session_id=chat_request.session_id, user_id=chat_request.user_id, message=chat_request.message, response=response)
-    mysql_client.create_record('chat_messages', convert_datetime_to_string(chat_message.dict()))
+    await write_buffer.write('chat_messages', *model_row(chat_message))
+    chat_context.append(chat_request.session_id, chat_request.message, response)
     return {"response": response, "session_id": chat_request.session_id}
 
+async def stream_chat_response(chat_request: ChatRequest):
+    context = await chat_context.get(chat_request.session_id)
+    tokens = []
+    try:
+        async for token in ai_responder.stream(chat_request.message, context):
+            tokens.append(token)
+            yield sse_event({"token": token})
+    except AIResponseTimeout:
+        yield sse_event({"detail": "A IA demorou demais para responder, tente novamente"}, event="error")
+        return
+    # Só uma resposta completa é gravada; se o cliente desconectar, o gerador é fechado antes daqui
+    response = ''.join(tokens)
+    chat_message = ChatMessage(session_id=chat_request.session_id, user_id=chat_request.user_id, message=chat_request.message, response=response)
+    await write_buffer.write('chat_messages', *model_row(chat_message))
+    chat_context.append(chat_request.session_id, chat_request.message, response)
+    yield sse_event({"id": chat_message.id, "response": response, "session_id": chat_request.session_id}, event="done")
+
+@api_router.post("/chat/stream")
+async def stream_chat_with_ai(chat_request: ChatRequest):
+    """Mesma conversa de POST /chat, com os tokens enviados via Server-Sent Events assim que saem do motor"""
+    return StreamingResponse(
+        stream_chat_response(chat_request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @api_router.get("/chat/{session_id}")
-async def get_chat_history(session_id: str):
-    return mysql_client.find_all('chat_messages', {'session_id': session_id})
+async def get_chat_history(session_id: str, limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                           cursor: Optional[str] = None, fields: Optional[str] = None,
+                           order: str = Query("asc", pattern="^(asc|desc)$")):
+    data, after = await mysql_client.find_page('chat_messages', {'session_id': session_id}, sort_column='timestamp',
+                                               limit=limit, after=decode_cursor(cursor),
+                                               columns=parse_fields(fields, ChatMessage), descending=order == "desc")
+    return page_response(data, after)
+
+@api_router.get("/chat/{session_id}/export")
+async def export_chat_history(session_id: str):
+    rows = mysql_client.iter_all('chat_messages', {'session_id': session_id}, order_by='timestamp')
+    return StreamingResponse(stream_ndjson(rows), media_type="application/x-ndjson")
 
 @api_router.post("/workouts")
 async def save_workout(workout: WorkoutPlan):
-    mysql_client.create_record('workouts', convert_datetime_to_string(workout.dict()))
+    await mysql_client.insert_row('workouts', *model_row(workout))
+    workout_list_cache.invalidate(workout.user_id)
     return {"message": "Treino salvo com sucesso", "workout_id": workout.id}
 
+@api_router.post("/workouts/generate")
+async def generate_workout(plan_request: WorkoutPlanRequest):
+    spec = plan_spec(plan_request.category, plan_request.difficulty, plan_request.duration, plan_request.constraints)
+    plan, cached = await workout_plan_cache.get_or_generate(spec, ai_responder.generate_workout)
+    workout = WorkoutPlan(user_id=plan_request.user_id, title=plan['title'], category=plan_request.category,
+                          exercises=plan['exercises'], duration=plan_request.duration,
+                          difficulty=plan_request.difficulty, created_by_ai=True)
+    await mysql_client.insert_row('workouts', *model_row(workout))
+    workout_list_cache.invalidate(workout.user_id)
+    return {"message": "Treino gerado com sucesso", "workout": workout, "cached": cached}
+
 @api_router.get("/workouts/{user_id}")
-async def get_user_workouts(user_id: str):
-    return mysql_client.find_all('workouts', {'user_id': user_id})
+async def get_user_workouts(user_id: str, request: Request, limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                            cursor: Optional[str] = None, fields: Optional[str] = None,
+                            order: str = Query("desc", pattern="^(asc|desc)$")):
+    variant = (limit, cursor, fields, order)
+    cached = workout_list_cache.get(user_id, variant)
+    if cached is None:
+        version = workout_list_cache.begin()
+        data, after = await mysql_client.find_page('workouts', {'user_id': user_id}, sort_column='created_at',
+                                                   limit=limit, after=decode_cursor(cursor),
+                                                   columns=parse_fields(fields, WorkoutPlan), descending=order == "desc")
+        next_cursor = encode_cursor(after)
+        body = json_dumps([raw_json_columns(row, WORKOUT_JSON_COLUMNS) for row in data])
+        cached = workout_list_cache.put(user_id, variant, body, {"X-Next-Cursor": next_cursor} if next_cursor else {}, version)
+
+    etag, body, extra_headers = cached
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", **extra_headers}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@api_router.get("/workouts/{user_id}/export")
+async def export_user_workouts(user_id: str):
+    rows = mysql_client.iter_all('workouts', {'user_id': user_id}, order_by='created_at')
+    return StreamingResponse(stream_ndjson(rows, WORKOUT_JSON_COLUMNS), media_type="application/x-ndjson")
+
+@api_router.get("/metrics/password-hashing")
+async def password_hashing_metrics():
+    return password_hasher.stats()
+
+@api_router.get("/metrics/db-pool")
+async def db_pool_metrics():
+    return mysql_client.pool_stats()
+
+@api_router.get("/metrics/user-cache")
+async def user_cache_metrics():
+    return user_cache.stats()
+
+@api_router.get("/metrics/workout-cache")
+async def workout_cache_metrics():
+    return workout_list_cache.stats()
+
+@api_router.get("/metrics/write-buffer")
+async def write_buffer_metrics():
+    return write_buffer.stats()
+
+@api_router.get("/metrics/reset-token-sweeper")
+async def reset_token_sweeper_metrics():
+    return reset_token_sweeper.stats()
+
+@api_router.get("/metrics/chat-context")
+async def chat_context_metrics():
+    return chat_context.stats()
+
+@api_router.get("/metrics/ai-responder")
+async def ai_responder_metrics():
+    return ai_responder.stats()
+
+@api_router.get("/metrics/workout-plan-cache")
+async def workout_plan_cache_metrics():
+    return workout_plan_cache.stats()
+
+# Rotas de depuração e administração: exigem o token de ADMIN_TOKEN; sem ele configurado ficam desativadas
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Token de administrador inválido")
+
+@api_router.get("/debug/query-profile", dependencies=[Depends(require_admin)])
+async def query_profile(limit: int = Query(20, ge=1, le=500),
+                        sort: str = Query("total", pattern="^(total|max|mean|count|rows)$")):
+    """Formatos de consulta mais caros (QUERY_PROFILER_ENABLED) e as últimas consultas lentas (SLOW_QUERY_THRESHOLD_MS)"""
+    return {
+        **query_profiler.stats(),
+        "shapes": query_profiler.top(limit, sort),
+        "slow_queries": query_profiler.slow_queries(limit),
+    }
+
+@api_router.post("/debug/query-profile/reset", dependencies=[Depends(require_admin)])
+async def reset_query_profile():
+    query_profiler.reset()
+    return {"message": "Perfil de consultas zerado"}
+
+@api_router.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def run_sampling_profiler(seconds: float = Query(10, gt=0, le=120), interval_ms: float = Query(10, ge=1, le=1000),
+                                tasks: bool = True):
+    """Amostra as pilhas de threads e tasks por `seconds` segundos e devolve o arquivo collapsed (flamegraph)"""
+    try:
+        result = await sampling_profiler.profile(seconds, interval_ms / 1000, include_tasks=tasks)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="Já existe uma coleta em andamento")
+    return PlainTextResponse(result["collapsed"], headers={
+        "X-Profile-Samples": str(result["samples"]),
+        "Content-Disposition": f'attachment; filename="profile-{int(result["started_at"])}.collapsed"',
+    })
+
+@api_router.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def sampling_profiler_status():
+    return sampling_profiler.stats()
+
+# Métricas no formato do Prometheus: HTTP e consultas (request_metrics/metrics) mais pool e bcrypt
+def db_pool_collector():
+    stats = mysql_client.pool_stats()
+    lines = render_value("db_pool_connections_in_use", "gauge", "Conexões emprestadas", stats["in_use"])
+    lines += render_value("db_pool_connections_idle", "gauge", "Conexões ociosas no pool", stats["idle"])
+    lines += render_value("db_pool_waiters", "gauge", "Requisições esperando conexão", stats["waiters"])
+    lines += render_value("db_pool_timeouts_total", "counter", "Esperas por conexão que estouraram o timeout", stats["timeouts"])
+    lines += ["# HELP db_pool_wait_seconds Espera para obter uma conexão do pool", "# TYPE db_pool_wait_seconds histogram"]
+    lines += render_histogram("db_pool_wait_seconds", stats["acquire_latency_seconds"])
+    return lines
+
+def password_hashing_collector():
+    stats = password_hasher.stats()
+    lines = render_value("password_hash_in_flight", "gauge", "Hashes bcrypt em andamento ou na fila", stats["in_flight"])
+    lines += render_value("password_hash_rejected_total", "counter", "Hashes recusados com 503", stats["rejected"])
+    lines += ["# HELP password_hash_seconds Tempo de cada hash/verify bcrypt", "# TYPE password_hash_seconds histogram"]
+    lines += render_histogram("password_hash_seconds", stats["hash_seconds"])
+    return lines
+
+registry.add_collector(db_pool_collector)
+registry.add_collector(password_hashing_collector)
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor ocupado, tente novamente em instantes"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.exception_handler(AIResponseTimeout)
+async def ai_response_timeout_handler(request: Request, exc: AIResponseTimeout):
+    return JSONResponse(status_code=504, content={"detail": "A IA demorou demais para responder, tente novamente"})
+
+@app.on_event("startup")
+async def startup_db_client():
+    await mysql_client.connect()
+    if os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true":
+        write_buffer.start()
+    reset_token_sweeper.start()
+
+@app.on_event("shutdown")
+async def shutdown_db_client():
+    await reset_token_sweeper.stop()
+    await write_buffer.stop()
+    await mysql_client.close()
+    password_hasher.shutdown()
 
 # Middleware e Start
 app.add_middleware(
@@ -231,7 +509,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# Por último: fica por fora de tudo e mede a requisição inteira, CORS incluído
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(api_router)
 
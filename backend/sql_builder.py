@@ -0,0 +1,153 @@
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+from uuids import uuid7, uuid_codec
+
+# SQL gerado pelos clientes MySQL, em cache por (tabela, colunas, operação).
+# As chaves são tuplas de nomes de colunas, então o mesmo formato de consulta
+# devolve sempre a mesma string, sem montar o texto de novo a cada chamada.
+
+
+@lru_cache(maxsize=512)
+def insert_sql(table: str, columns: Tuple[str, ...]) -> str:
+    placeholders = ', '.join(['%s'] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+@lru_cache(maxsize=512)
+def update_sql(table: str, columns: Tuple[str, ...]) -> str:
+    set_clause = ', '.join([f"{k} = %s" for k in columns])
+    return f"UPDATE {table} SET {set_clause} WHERE id = %s"
+
+
+@lru_cache(maxsize=128)
+def delete_sql(table: str) -> str:
+    return f"DELETE FROM {table} WHERE id = %s"
+
+
+@lru_cache(maxsize=512)
+def select_sql(table: str, filter_columns: Tuple[str, ...] = (), order_by: Optional[str] = None,
+               greater_than: Tuple[str, ...] = ()) -> str:
+    conditions = [f"{k} = %s" for k in filter_columns] + [f"{k} > %s" for k in greater_than]
+    query = f"SELECT * FROM {table}"
+    if conditions:
+        query += f" WHERE {' AND '.join(conditions)}"
+    if order_by:
+        query += f" ORDER BY {order_by}, id"
+    return query
+
+
+def insert_many_params(rows: List[Dict[str, Any]]) -> Tuple[Tuple[str, ...], List[tuple], List[str]]:
+    """Normaliza linhas para INSERT multi-linha: gera ids, converte datetime e alinha as colunas"""
+    columns = None
+    params = []
+    ids = []
+    for data in rows:
+        if 'id' not in data:
+            data['id'] = uuid7()
+        if columns is None:
+            columns = tuple(data)
+        elif data.keys() != set(columns):
+            raise Exception("Todos os registros devem ter as mesmas colunas")
+        values = []
+        for column in columns:
+            value = data[column]
+            values.append(value.isoformat() if isinstance(value, datetime) else value)
+        params.append(tuple(values))
+        ids.append(data['id'])
+    return columns, params, ids
+
+
+@lru_cache(maxsize=512)
+def page_sql(table: str, columns: Optional[Tuple[str, ...]], filter_columns: Tuple[str, ...],
+             sort_column: str, descending: bool, has_cursor: bool) -> str:
+    """SELECT paginado por keyset (sort_column, id), com projeção opcional e LIMIT como parâmetro"""
+    projection = ', '.join(columns) if columns else '*'
+    conditions = [f"{k} = %s" for k in filter_columns]
+    comparison = '<' if descending else '>'
+    if has_cursor:
+        conditions.append(
+            f"({sort_column} {comparison} %s OR ({sort_column} = %s AND id {comparison} %s))"
+        )
+    where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    direction = 'DESC' if descending else 'ASC'
+    return (
+        f"SELECT {projection} FROM {table}{where_clause} "
+        f"ORDER BY {sort_column} {direction}, id {direction} LIMIT %s"
+    )
+
+
+# Comandos completos (SQL + parâmetros) das operações CRUD. Os dois clientes só executam
+# o que sai daqui; geração de id, conversão de datetime e de chaves UUID ficam neste módulo
+
+
+def _db_value(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def insert_statement(table: str, data: Dict[str, Any]) -> Tuple[str, tuple, str]:
+    """INSERT de um registro (dict): gera o id se faltar e devolve (sql, parâmetros, id)"""
+    if 'id' not in data:
+        data['id'] = uuid7()
+    columns = tuple(data)
+    values = tuple(_db_value(value) for value in data.values())
+    return insert_sql(table, columns), uuid_codec.encode_values(columns, values), data['id']
+
+
+def row_insert_statement(table: str, columns: Tuple[str, ...], values: tuple) -> Tuple[str, tuple]:
+    """INSERT de uma linha já serializada (ver serializers.model_row)"""
+    return insert_sql(table, columns), uuid_codec.encode_values(columns, values)
+
+
+def rows_insert_statement(table: str, columns: Tuple[str, ...], rows: List[tuple],
+                          batch_size: int) -> Tuple[str, List[List[tuple]]]:
+    """INSERT multi-linha de linhas já serializadas, em lotes de até batch_size"""
+    if uuid_codec.enabled:
+        rows = [uuid_codec.encode_values(columns, values) for values in rows]
+    return insert_sql(table, columns), [rows[start:start + batch_size] for start in range(0, len(rows), batch_size)]
+
+
+def update_statement(table: str, record_id: str, update_data: Dict[str, Any]) -> Tuple[str, tuple]:
+    if not update_data:
+        raise Exception("Nenhum dado para atualizar fornecido")
+    columns = tuple(update_data)
+    values = tuple(_db_value(value) for value in update_data.values())
+    return update_sql(table, columns), uuid_codec.encode_values(columns, values) + (uuid_codec.encode_id(record_id),)
+
+
+def delete_statement(table: str, record_id: str) -> Tuple[str, tuple]:
+    return delete_sql(table), (uuid_codec.encode_id(record_id),)
+
+
+def select_statement(table: str, filter_dict: Optional[Dict[str, Any]] = None, order_by: Optional[str] = None,
+                     greater_than: Optional[Dict[str, Any]] = None) -> Tuple[str, tuple]:
+    """SELECT com colunas iguais a filter_dict e, opcionalmente, maiores que greater_than"""
+    filter_dict = filter_dict or {}
+    greater_than = greater_than or {}
+    columns = tuple(filter_dict)
+    query = select_sql(table, columns, order_by, tuple(greater_than))
+    return query, uuid_codec.encode_values(columns, tuple(filter_dict.values())) + tuple(greater_than.values())
+
+
+def page_statement(table: str, filter_dict: Optional[Dict[str, Any]], sort_column: str, limit: int,
+                   after: Optional[tuple], columns: Optional[List[str]], descending: bool) -> Tuple[str, tuple]:
+    """SELECT de uma página por keyset; pede limit + 1 linhas para saber se existe a próxima"""
+    filter_dict = filter_dict or {}
+    projection = tuple(dict.fromkeys([*columns, sort_column, 'id'])) if columns else None
+    filter_columns = tuple(filter_dict)
+    query = page_sql(table, projection, filter_columns, sort_column, descending, after is not None)
+    params = uuid_codec.encode_values(filter_columns, tuple(filter_dict.values()))
+    if after is not None:
+        params += (after[0], after[0], uuid_codec.encode_id(after[1]))
+    return query, params + (limit + 1,)
+
+
+def page_result(rows: List[Dict[str, Any]], limit: int,
+                sort_column: str) -> Tuple[List[Dict[str, Any]], Optional[tuple]]:
+    """Linhas da página e o cursor (valor de sort_column, id) da próxima, ou None na última"""
+    rows = uuid_codec.decode_rows(list(rows))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1][sort_column], rows[-1]['id'])
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Lotes pequenos com LIMIT: cada DELETE segura poucos locks e não bloqueia os lookups por token
+PURGE_EXPIRED_SQL = "DELETE FROM password_reset_tokens WHERE expires_at < %s LIMIT %s"
+PURGE_USED_SQL = "DELETE FROM password_reset_tokens WHERE used = TRUE LIMIT %s"
+
+
+class ResetTokenSweeper:
+    """Tarefa periódica que apaga tokens de recuperação de senha usados ou expirados.
+
+    A cada `interval` segundos remove lotes de até `batch_size` linhas até não sobrar
+    nenhum token vencido, registrando quantas linhas saíram. `interval` 0 desativa a tarefa.
+    """
+
+    def __init__(self, client, interval: float = None, batch_size: int = None):
+        self.client = client
+        self.interval = interval if interval is not None else float(os.getenv("RESET_TOKEN_SWEEP_INTERVAL", "300"))
+        self.batch_size = batch_size or int(os.getenv("RESET_TOKEN_SWEEP_BATCH_SIZE", "500"))
+        self.task = None
+        self.runs = 0
+        self.expired_removed = 0
+        self.used_removed = 0
+        self.failed_runs = 0
+        self.last_run_at = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None
+
+    def start(self):
+        if self.task is None and self.interval > 0:
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep()
+            except Exception:
+                self.failed_runs += 1
+                logger.exception("Falha ao remover tokens de recuperação vencidos")
+
+    async def _purge(self, query: str, params: tuple) -> int:
+        removed = 0
+        while True:
+            deleted = await self.client.execute_query(query, params)
+            removed += deleted
+            if deleted < self.batch_size:
+                return removed
+
+    async def sweep(self) -> Dict[str, int]:
+        """Executa uma passada completa e devolve as linhas removidas por motivo"""
+        expired = await self._purge(PURGE_EXPIRED_SQL, (datetime.utcnow(), self.batch_size))
+        used = await self._purge(PURGE_USED_SQL, (self.batch_size,))
+        self.runs += 1
+        self.expired_removed += expired
+        self.used_removed += used
+        self.last_run_at = datetime.utcnow()
+        if expired or used:
+            logger.info("Tokens de recuperação removidos: %d expirados, %d usados", expired, used)
+        return {"expired": expired, "used": used}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "batch_size": self.batch_size,
+            "runs": self.runs,
+            "failed_runs": self.failed_runs,
+            "expired_removed": self.expired_removed,
+            "used_removed": self.used_removed,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
@@ -0,0 +1,155 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from cache import TTLCache
+
+# Contador de invalidações no Redis, compartilhado entre workers
+VERSION_KEY = "user:version"
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class UserCache:
+    """Cache read-through de usuários por email e por id.
+
+    Por padrão fica em memória (LRU + TTL). Com USER_CACHE_REDIS_URL as entradas vão para
+    um Redis (ou compatível) local, compartilhado entre workers. As entradas são invalidadas
+    sempre que o cliente MySQL atualiza ou remove uma linha de `users`. Buscas sem resultado
+    não são guardadas, então um cadastro novo nunca esbarra num "não existe" em cache.
+
+    Uma leitura que começou antes de uma invalidação não é guardada: cada invalidação avança
+    uma versão (no Redis, um contador compartilhado) e o resultado só entra no cache se a
+    versão não mudou durante a consulta. Sem isso, um login lido logo antes do commit de
+    reset_password guardaria o hash antigo por até USER_CACHE_TTL segundos.
+    """
+
+    def __init__(self, client, ttl: float = None, max_entries: int = None, redis_url: str = None):
+        self.client = client
+        self.ttl = ttl or float(os.getenv("USER_CACHE_TTL", "60"))
+        self.max_entries = max_entries or int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_reads = 0
+
+        self._local = TTLCache(self.max_entries, self.ttl, on_evict=self._forget_local)
+        self._email_by_id = {}
+        self._version = 0
+        self._redis = None
+        redis_url = redis_url or os.getenv("USER_CACHE_REDIS_URL")
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+                from redis.exceptions import WatchError
+            except ImportError:
+                raise Exception("USER_CACHE_REDIS_URL definido, mas o pacote redis não está instalado")
+            self._redis = redis.from_url(redis_url)
+            self._watch_error = WatchError
+
+        client.add_change_listener('users', self.invalidate)
+
+    def _forget_local(self, email, user):
+        if self._email_by_id.get(user['id']) == email:
+            del self._email_by_id[user['id']]
+
+    async def _get(self, email: str) -> Optional[Dict[str, Any]]:
+        if self._redis is None:
+            return self._local.get(email)
+        raw = await self._redis.get(f"user:email:{email}")
+        return json.loads(raw) if raw else None
+
+    async def _email_for(self, user_id: str) -> Optional[str]:
+        if self._redis is None:
+            return self._email_by_id.get(user_id)
+        raw = await self._redis.get(f"user:id:{user_id}")
+        return raw.decode() if raw else None
+
+    async def _begin(self) -> int:
+        """Versão atual das invalidações, lida antes da consulta ao banco"""
+        if self._redis is None:
+            return self._version
+        return int(await self._redis.get(VERSION_KEY) or 0)
+
+    async def _set(self, user: Dict[str, Any], version: int):
+        if self._redis is None:
+            if version != self._version:
+                self.stale_reads += 1
+                return
+            self._local.set(user['email'], user)
+            self._email_by_id[user['id']] = user['email']
+            return
+        ttl = max(1, int(self.ttl))
+        # WATCH na versão: uma invalidação de qualquer worker entre a leitura e o SET aborta a gravação
+        async with self._redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(VERSION_KEY)
+                if int(await pipe.get(VERSION_KEY) or 0) != version:
+                    self.stale_reads += 1
+                    return
+                pipe.multi()
+                pipe.set(f"user:email:{user['email']}", json.dumps(user, default=_json_default), ex=ttl)
+                pipe.set(f"user:id:{user['id']}", user['email'], ex=ttl)
+                await pipe.execute()
+            except self._watch_error:
+                self.stale_reads += 1
+
+    async def _load(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        self.misses += 1
+        version = await self._begin()
+        user = await self.client.find_one('users', {column: value})
+        if user:
+            await self._set(user, version)
+        return user
+
+    async def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        user = await self._get(email)
+        if user is not None:
+            self.hits += 1
+            return user
+        return await self._load('email', email)
+
+    async def find_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        email = await self._email_for(user_id)
+        user = await self._get(email) if email else None
+        if user is not None:
+            self.hits += 1
+            return user
+        return await self._load('id', user_id)
+
+    async def invalidate(self, user_id: str):
+        self.invalidations += 1
+        if self._redis is None:
+            self._version += 1
+            email = self._email_by_id.pop(user_id, None)
+            if email:
+                self._local.pop(email)
+            return
+        email = await self._email_for(user_id)
+        keys = [f"user:id:{user_id}"] + ([f"user:email:{email}"] if email else [])
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.incr(VERSION_KEY)
+            pipe.delete(*keys)
+            await pipe.execute()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        stats = {
+            "backend": "redis" if self._redis is not None else "memory",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "stale_reads": self.stale_reads,
+        }
+        if self._redis is None:
+            local = self._local.stats()
+            stats.update(entries=local["entries"], max_entries=self.max_entries,
+                         evictions=local["evictions"], expirations=local["expirations"])
+        return stats
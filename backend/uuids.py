@@ -0,0 +1,81 @@
+import os
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+# Colunas de chave UUID em todas as tabelas (PKs e FKs para users.id)
+UUID_KEY_COLUMNS = ('id', 'user_id')
+
+
+def uuid7() -> str:
+    """UUID versão 7: 48 bits de timestamp em ms seguidos de bits aleatórios.
+
+    Ids gerados em sequência ficam ordenados, então inserts caem no fim do índice
+    em vez de dividir páginas no meio da árvore.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), 'big')
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                                 # versão
+    value |= ((random_bits >> 62) & 0xFFF) << 64       # rand_a
+    value |= 0b10 << 62                                # variante RFC 4122
+    value |= random_bits & 0x3FFF_FFFF_FFFF_FFFF       # rand_b
+    return str(uuid.UUID(int=value))
+
+
+class UUIDCodec:
+    """Converte chaves UUID entre texto (API/modelos) e BINARY(16) (banco) quando o modo binário está ativo.
+
+    Com MYSQL_BINARY_UUIDS desligado todos os métodos devolvem os valores como vieram.
+    """
+
+    def __init__(self, enabled: bool, columns: Tuple[str, ...] = UUID_KEY_COLUMNS):
+        self.enabled = enabled
+        self.columns = frozenset(columns)
+
+    @classmethod
+    def from_env(cls) -> "UUIDCodec":
+        return cls(os.getenv("MYSQL_BINARY_UUIDS", "false").lower() in ("1", "true", "yes", "on"))
+
+    @staticmethod
+    def to_db(value: Any) -> Any:
+        if isinstance(value, str) and len(value) == 36:
+            try:
+                return uuid.UUID(value).bytes
+            except ValueError:
+                # Não é um UUID: segue como veio e simplesmente não casa com nenhuma linha
+                return value
+        return value
+
+    @staticmethod
+    def from_db(value: Any) -> Any:
+        if isinstance(value, (bytes, bytearray)) and len(value) == 16:
+            return str(uuid.UUID(bytes=bytes(value)))
+        return value
+
+    def encode_id(self, value: Any) -> Any:
+        return self.to_db(value) if self.enabled else value
+
+    def encode_values(self, columns: Tuple[str, ...], values: tuple) -> tuple:
+        if not self.enabled:
+            return values
+        return tuple(
+            self.to_db(value) if column in self.columns else value
+            for column, value in zip(columns, values)
+        )
+
+    def decode_row(self, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if self.enabled and row is not None:
+            for column in self.columns:
+                if column in row:
+                    row[column] = self.from_db(row[column])
+        return row
+
+    def decode_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.enabled:
+            for row in rows:
+                self.decode_row(row)
+        return rows
+
+
+uuid_codec = UUIDCodec.from_env()
@@ -0,0 +1,85 @@
+import copy
+import os
+import re
+import unicodedata
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple, Union
+
+from cache import TTLCache
+
+# Sinônimos aceitos para a dificuldade, já sem acentos e em minúsculas
+DIFFICULTY_ALIASES = {
+    'beginner': 'iniciante', 'facil': 'iniciante', 'basico': 'iniciante',
+    'intermediate': 'intermediario', 'medio': 'intermediario', 'moderado': 'intermediario',
+    'advanced': 'avancado', 'dificil': 'avancado', 'expert': 'avancado',
+}
+
+
+def _normalize_text(value: str) -> str:
+    # "  Hipertrofia " e "hipertrofia" devem cair na mesma entrada
+    value = unicodedata.normalize('NFKD', value).encode('ascii', 'ignore').decode()
+    return ' '.join(value.lower().split())
+
+
+# "45", "45 min", "1h", "1h30", "1,5h", "1.5 horas", "2 horas e 30 minutos", "2 hours and 30 minutes"
+DURATION_PATTERN = re.compile(
+    r'(?:(?P<hours>\d+(?:\.\d+)?)\s*(?:h|hrs?|horas?|hours?))?'
+    r'\s*(?:(?:e|and)\s+)?'
+    r'(?:(?P<minutes>\d+(?:\.\d+)?)\s*(?:m|min|mins|minutos?|minutes?)?)?'
+)
+
+
+def _duration_minutes(duration: str) -> Union[int, str]:
+    """Duração em minutos; o que não der para interpretar volta como o texto normalizado,
+    para que pedidos diferentes não caiam todos na mesma entrada do cache"""
+    text = _normalize_text(duration)
+    match = DURATION_PATTERN.fullmatch(re.sub(r'(\d),(\d)', r'\1.\2', text))
+    if not match or not (match['hours'] or match['minutes']):
+        return text
+    minutes = float(match['hours'] or 0) * 60 + float(match['minutes'] or 0)
+    return round(minutes) if minutes > 0 else text
+
+
+def plan_spec(category: str, difficulty: str, duration: str, constraints: Iterable[str] = ()) -> Dict[str, Any]:
+    """Pedido de plano que o motor recebe. A categoria vai como o usuário escreveu, para o texto
+    do plano; plan_fingerprint() a normaliza na chave do cache"""
+    difficulty = _normalize_text(difficulty)
+    return {
+        "category": ' '.join(category.split()),
+        "difficulty": DIFFICULTY_ALIASES.get(difficulty, difficulty),
+        "duration_minutes": _duration_minutes(duration),
+        "constraints": sorted({_normalize_text(c) for c in constraints if c and c.strip()}),
+    }
+
+
+def plan_fingerprint(spec: Dict[str, Any]) -> Tuple:
+    return _normalize_text(spec["category"]), spec["difficulty"], spec["duration_minutes"], tuple(spec["constraints"])
+
+
+class WorkoutPlanCache:
+    """Planos de treino gerados pela IA, por fingerprint normalizado (LRU + TTL).
+
+    O cache guarda só o conteúdo do plano (título e exercícios); cada usuário recebe uma
+    cópia própria, então alterar o plano de um não afeta a entrada nem os outros.
+    """
+
+    def __init__(self, ttl: float = None, max_entries: int = None):
+        self.ttl = ttl or float(os.getenv("WORKOUT_PLAN_CACHE_TTL", "86400"))
+        self.max_entries = max_entries or int(os.getenv("WORKOUT_PLAN_CACHE_MAX_ENTRIES", "2000"))
+        self._plans = TTLCache(self.max_entries, self.ttl)
+
+    async def get_or_generate(self, spec: Dict[str, Any],
+                              generate: Callable[[Dict[str, Any], Tuple], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """Devolve (cópia do plano, veio do cache?)"""
+        key = plan_fingerprint(spec)
+        plan = self._plans.get(key)
+        cached = plan is not None
+        if not cached:
+            plan = await generate(spec, key)
+            self._plans.set(key, plan)
+        return copy.deepcopy(plan), cached
+
+    def clear(self):
+        self._plans.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self._plans.stats()
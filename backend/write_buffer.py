@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import os
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Marca de fim da fila usada no shutdown
+_STOP = object()
+
+
+class WriteBehindBuffer:
+    """Acumula inserts de tabelas de alto volume e grava em lotes com insert_rows.
+
+    Um lote é gravado quando atinge `max_batch` linhas ou quando `flush_interval`
+    segundos passam desde a primeira linha pendente. A fila é limitada a `max_queue`
+    itens: quando enche, write() espera (backpressure) em vez de crescer sem limite.
+    Sem start(), write() grava direto no banco.
+
+    O cliente já recebeu sucesso quando a linha é gravada, então um lote que falha é
+    tentado de novo até `retries` vezes (espera de `retry_backoff` segundos, dobrando a
+    cada tentativa) e, se ainda falhar, gravado linha a linha: só as linhas que falham
+    sozinhas são descartadas (e contadas em `failed`).
+    """
+
+    def __init__(self, client, max_batch: int = None, flush_interval: float = None, max_queue: int = None,
+                 retries: int = None, retry_backoff: float = None):
+        self.client = client
+        self.max_batch = max_batch or int(os.getenv("WRITE_BEHIND_MAX_BATCH", "200"))
+        self.flush_interval = flush_interval or float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "0.5"))
+        self.max_queue = max_queue or int(os.getenv("WRITE_BEHIND_MAX_QUEUE", "10000"))
+        self.retries = retries if retries is not None else int(os.getenv("WRITE_BEHIND_RETRIES", "3"))
+        self.retry_backoff = retry_backoff if retry_backoff is not None else float(os.getenv("WRITE_BEHIND_RETRY_BACKOFF", "0.1"))
+        self.queue = None
+        self.task = None
+        self.flushed = 0
+        self.failed = 0
+        self.retried = 0
+        self.row_fallbacks = 0
+        self.batches = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None
+
+    def start(self):
+        if self.task is None:
+            self.queue = asyncio.Queue(maxsize=self.max_queue)
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Grava tudo o que estiver na fila e encerra a tarefa de flush"""
+        if self.task is None:
+            return
+        await self.queue.put(_STOP)
+        await self.task
+        self.task = None
+        self.queue = None
+
+    async def write(self, table: str, columns: Tuple[str, ...], values: tuple):
+        """Enfileira uma linha já serializada (ver serializers.model_row)"""
+        if self.task is None:
+            await self.client.insert_row(table, columns, values)
+            return
+        await self.queue.put((table, columns, values))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            stopping = False
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+            if stopping:
+                return
+
+    async def _flush(self, batch: List[Tuple[str, Tuple[str, ...], tuple]]):
+        groups = {}
+        for table, columns, values in batch:
+            groups.setdefault((table, columns), []).append(values)
+
+        for (table, columns), rows in groups.items():
+            if not await self._insert_batch(table, columns, rows):
+                await self._insert_each(table, columns, rows)
+        self.batches += 1
+
+    async def _insert_batch(self, table: str, columns: Tuple[str, ...], rows: List[tuple]) -> bool:
+        for attempt in range(self.retries + 1):
+            try:
+                # Um único INSERT por grupo: ou o lote inteiro entra ou nada entra, e repetir é seguro
+                await self.client.insert_rows(table, columns, rows, batch_size=len(rows))
+                self.flushed += len(rows)
+                return True
+            except Exception:
+                logger.warning("Falha ao gravar lote de %d linhas em %s (tentativa %d de %d)",
+                               len(rows), table, attempt + 1, self.retries + 1, exc_info=True)
+            if attempt < self.retries:
+                self.retried += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        return False
+
+    async def _insert_each(self, table: str, columns: Tuple[str, ...], rows: List[tuple]):
+        # Uma linha inválida não leva o lote junto
+        self.row_fallbacks += 1
+        for values in rows:
+            try:
+                await self.client.insert_row(table, columns, values)
+                self.flushed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Linha descartada ao gravar em %s", table)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue": self.max_queue,
+            "max_batch": self.max_batch,
+            "flush_interval": self.flush_interval,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "row_fallbacks": self.row_fallbacks,
+            "batches": self.batches,
+        }
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the /api surface.
+
+By default it starts a throwaway local MySQL (see local_mysql.py), applies
+backend/migrate.py, launches backend/server.py with uvicorn, seeds users, workouts
+and chat sessions, then drives one workload with N concurrent clients for a fixed
+time. Per route it reports throughput and p50/p95/p99 latency, and writes everything
+to a JSON file that --compare can diff against a previous run.
+
+    python benchmarks/load_test.py --workload mixed --concurrency 32 --duration 30
+    python benchmarks/load_test.py --workload login --output results/login.json
+    python benchmarks/load_test.py --workload chat --compare results/chat-before.json
+    python benchmarks/load_test.py --base-url http://localhost:8001 --workload workouts
+
+Workloads: login (login-heavy), chat (chat-heavy), workouts (workout-list-heavy), mixed.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests  # type: ignore
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+PASSWORD = "BenchSenh@123"
+
+
+# Workloads: (route label, weight); the label is the route template used in the report
+
+WORKLOADS = {
+    'login': [
+        ("POST /api/login", 80),
+        ("GET /api/workouts/{user_id}", 10),
+        ("POST /api/status", 10),
+    ],
+    'chat': [
+        ("POST /api/chat", 55),
+        ("GET /api/chat/{session_id}", 30),
+        ("POST /api/chat/stream", 15),
+    ],
+    'workouts': [
+        ("GET /api/workouts/{user_id}", 70),
+        ("POST /api/workouts", 10),
+        ("POST /api/workouts/generate", 10),
+        ("GET /api/workouts/{user_id}/export", 10),
+    ],
+    'mixed': [
+        ("POST /api/login", 15),
+        ("POST /api/chat", 20),
+        ("GET /api/chat/{session_id}", 15),
+        ("GET /api/workouts/{user_id}", 35),
+        ("POST /api/workouts", 5),
+        ("POST /api/workouts/generate", 5),
+        ("POST /api/status", 5),
+    ],
+}
+
+CATEGORIES = ['Cardio', 'Força', 'HIIT', 'Flexibilidade']
+DIFFICULTIES = ['Iniciante', 'Intermediário', 'Avançado']
+DURATIONS = ['20 min', '30 min', '45 min', '60 min']
+
+
+def workout_payload(user_id: str) -> dict:
+    return {
+        "user_id": user_id,
+        "title": f"Treino {random.randint(1, 1000)}",
+        "category": random.choice(CATEGORIES),
+        "exercises": [{"name": "Agachamento", "sets": 3, "reps": "12", "rest": "45s"} for _ in range(6)],
+        "duration": random.choice(DURATIONS),
+        "difficulty": random.choice(DIFFICULTIES),
+    }
+
+
+class Fixtures:
+    """Users, sessions and workouts created before the timed run"""
+
+    def __init__(self, api: str, users: int, workouts_per_user: int, messages_per_session: int):
+        self.api = api
+        self.users = []
+        session = requests.Session()
+        run_id = uuid.uuid4().hex[:8]
+        for index in range(users):
+            email = f"bench.{run_id}.{index}@example.com"
+            response = session.post(f"{api}/register", json={"name": f"Bench {index}", "email": email, "password": PASSWORD})
+            response.raise_for_status()
+            user = {"id": response.json()["user_id"], "email": email, "session_id": f"bench-{run_id}-{index}"}
+            for _ in range(workouts_per_user):
+                session.post(f"{api}/workouts", json=workout_payload(user["id"])).raise_for_status()
+            for turn in range(messages_per_session):
+                session.post(f"{api}/chat", json={"session_id": user["session_id"], "user_id": user["id"],
+                                                  "message": f"Mensagem {turn}"}).raise_for_status()
+            self.users.append(user)
+
+
+def run_operation(session: requests.Session, api: str, route: str, user: dict) -> requests.Response:
+    if route == "POST /api/login":
+        return session.post(f"{api}/login", json={"email": user["email"], "password": PASSWORD})
+    if route == "POST /api/status":
+        return session.post(f"{api}/status", json={"client_name": "bench"})
+    if route == "POST /api/chat":
+        return session.post(f"{api}/chat", json={"session_id": user["session_id"], "user_id": user["id"],
+                                                 "message": random.choice(["Treino de hoje?", "Quantas séries?", "Dica de aquecimento"])})
+    if route == "POST /api/chat/stream":
+        response = session.post(f"{api}/chat/stream", stream=True,
+                                json={"session_id": user["session_id"], "user_id": user["id"], "message": "Treino de pernas?"})
+        for _ in response.iter_content(chunk_size=None):
+            pass
+        return response
+    if route == "GET /api/chat/{session_id}":
+        return session.get(f"{api}/chat/{user['session_id']}", params={"limit": 50})
+    if route == "GET /api/workouts/{user_id}":
+        return session.get(f"{api}/workouts/{user['id']}", params={"limit": 50})
+    if route == "GET /api/workouts/{user_id}/export":
+        response = session.get(f"{api}/workouts/{user['id']}/export", stream=True)
+        for _ in response.iter_content(chunk_size=None):
+            pass
+        return response
+    if route == "POST /api/workouts":
+        return session.post(f"{api}/workouts", json=workout_payload(user["id"]))
+    if route == "POST /api/workouts/generate":
+        return session.post(f"{api}/workouts/generate", json={
+            "user_id": user["id"], "category": random.choice(CATEGORIES),
+            "difficulty": random.choice(DIFFICULTIES), "duration": random.choice(DURATIONS),
+        })
+    raise ValueError(f"Unknown route {route}")
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def run_load(api: str, workload: str, fixtures: Fixtures, concurrency: int, duration: float, warmup: float) -> dict:
+    routes, weights = zip(*WORKLOADS[workload])
+    lock = threading.Lock()
+    samples = {route: [] for route in routes}
+    errors = {route: 0 for route in routes}
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+
+    def client(worker: int):
+        rng = random.Random(worker)
+        session = requests.Session()
+        local_samples = {route: [] for route in routes}
+        local_errors = {route: 0 for route in routes}
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                break
+            route = rng.choices(routes, weights)[0]
+            user = rng.choice(fixtures.users)
+            started = time.perf_counter()
+            try:
+                ok = run_operation(session, api, route, user).status_code < 400
+            except requests.RequestException:
+                ok = False
+            finished = time.perf_counter()
+            # Requests that started during warmup are not measured
+            if started < start_at:
+                continue
+            local_samples[route].append(finished - started)
+            if not ok:
+                local_errors[route] += 1
+        with lock:
+            for route in routes:
+                samples[route].extend(local_samples[route])
+                errors[route] += local_errors[route]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(client, range(concurrency)))
+    elapsed = max(time.perf_counter(), stop_at) - start_at
+
+    all_latencies = [latency for route in routes for latency in samples[route]]
+    return {
+        "routes": {route: summarize(samples[route], errors[route], elapsed) for route in routes},
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "elapsed_seconds": round(elapsed, 3),
+    }
+
+
+# Environment: local database + server
+
+def wait_for_server(api: str, process: subprocess.Popen, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("server.py exited during startup")
+        try:
+            if requests.get(f"{api}/", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"server.py did not answer within {timeout}s")
+
+
+def start_server(env: dict, port: int) -> subprocess.Popen:
+    subprocess.run([sys.executable, 'migrate.py'], cwd=BACKEND_DIR, env=env, check=True)
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env,
+    )
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+# Output
+
+def print_report(results: dict):
+    print(f"\nWorkload {results['workload']}: concurrency {results['concurrency']}, "
+          f"{results['result']['elapsed_seconds']}s measured")
+    header = f"{'route':<36} {'reqs':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    rows = list(results['result']['routes'].items()) + [("TOTAL", results['result']['total'])]
+    for route, stats in rows:
+        print(f"{route:<36} {stats['requests']:>7} {stats['errors']:>5} {stats['throughput_rps']:>9} "
+              f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}")
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> bool:
+    """Print per-route deltas against a previous run; False if any route regressed past `threshold` percent"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    ok = True
+    print(f"\nCompared with {baseline_path} ({baseline.get('git_revision')}, {baseline.get('started_at')}):")
+    current_routes = dict(results['result']['routes'], TOTAL=results['result']['total'])
+    baseline_routes = dict(baseline['result']['routes'], TOTAL=baseline['result']['total'])
+    for route, stats in current_routes.items():
+        before = baseline_routes.get(route)
+        if not before or not before['requests'] or not stats['requests']:
+            continue
+        deltas = {}
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms'):
+            deltas[metric] = (stats[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0.0
+        deltas['throughput_rps'] = ((stats['throughput_rps'] - before['throughput_rps']) / before['throughput_rps'] * 100
+                                    if before['throughput_rps'] else 0.0)
+        regressed = deltas['p95_ms'] > threshold or deltas['throughput_rps'] < -threshold
+        ok = ok and not regressed
+        print(f"  {'REGRESSION' if regressed else 'ok':<10} {route:<36} "
+              + ' '.join(f"{metric} {delta:+.1f}%" for metric, delta in deltas.items()))
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the Zeni /api surface")
+    parser.add_argument('--workload', choices=sorted(WORKLOADS), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30, help="measured seconds")
+    parser.add_argument('--warmup', type=float, default=5, help="unmeasured seconds before the run")
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--workouts-per-user', type=int, default=20)
+    parser.add_argument('--messages-per-session', type=int, default=20)
+    parser.add_argument('--base-url', help="benchmark an already running server instead of starting one")
+    parser.add_argument('--use-env-mysql', action='store_true',
+                        help="start the server against the MYSQL_* settings from the environment instead of a local throwaway database")
+    parser.add_argument('--port', type=int, default=None, help="port for the server started by the harness")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help="extra environment for the server, e.g. --env WRITE_BEHIND_ENABLED=true")
+    parser.add_argument('--output', help="JSON results path (default benchmarks/results/<workload>-<timestamp>.json)")
+    parser.add_argument('--compare', help="previous results JSON to diff against")
+    parser.add_argument('--threshold', type=float, default=10.0, help="regression threshold in percent for --compare")
+    args = parser.parse_args(argv)
+
+    from local_mysql import LocalMySQL, free_port
+
+    database = None
+    server = None
+    started_at = datetime.utcnow().isoformat()
+    server_env = dict(kv.split('=', 1) for kv in args.env)
+    try:
+        if args.base_url:
+            api = f"{args.base_url.rstrip('/')}/api"
+        else:
+            env = dict(os.environ)
+            if not args.use_env_mysql:
+                database = LocalMySQL().start()
+                env.update(database.env())
+            env.update(server_env)
+            port = args.port or free_port()
+            server = start_server(env, port)
+            api = f"http://127.0.0.1:{port}/api"
+            wait_for_server(api, server)
+
+        print(f"Seeding {args.users} users against {api}")
+        fixtures = Fixtures(api, args.users, args.workouts_per_user, args.messages_per_session)
+        print(f"Running {args.workload} for {args.duration}s (+{args.warmup}s warmup) with {args.concurrency} clients")
+        result = run_load(api, args.workload, fixtures, args.concurrency, args.duration, args.warmup)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        if database is not None:
+            database.stop()
+
+    results = {
+        "workload": args.workload,
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "warmup_seconds": args.warmup,
+        "users": args.users,
+        "workouts_per_user": args.workouts_per_user,
+        "messages_per_session": args.messages_per_session,
+        "server_env": server_env,
+        "database": "external" if args.base_url or args.use_env_mysql else "local",
+        "git_revision": git_revision(),
+        "started_at": started_at,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "result": result,
+    }
+    print_report(results)
+
+    output = Path(args.output) if args.output else (
+        Path(__file__).resolve().parent / 'results' / f"{args.workload}-{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"\nResults saved to {output}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Throwaway MySQL/MariaDB server for benchmarks, without Docker.
+
+Initializes an empty data directory under a temp dir with the mysqld (or mariadbd)
+binary found on PATH (or in $MYSQLD), starts it on a free local port with a
+passwordless root user, creates the database and removes everything on stop.
+
+    with LocalMySQL() as db:
+        env = db.env()   # MYSQL_HOST / MYSQL_PORT / MYSQL_USER / MYSQL_PASSWORD / MYSQL_DATABASE
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def find_server_binary() -> str:
+    for candidate in (os.getenv('MYSQLD'), 'mysqld', 'mariadbd'):
+        if candidate and shutil.which(candidate):
+            return shutil.which(candidate)
+    raise RuntimeError("No mysqld/mariadbd on PATH; install MySQL or MariaDB server, or set MYSQLD")
+
+
+class LocalMySQL:
+    def __init__(self, database: str = 'zeni_saas', port: int = None, startup_timeout: float = 60):
+        self.database = database
+        self.port = port or free_port()
+        self.startup_timeout = startup_timeout
+        self.binary = find_server_binary()
+        self.is_mariadb = 'mariadb' in (os.path.basename(self.binary) + self._version()).lower()
+        self.base_dir = None
+        self.process = None
+
+    def _version(self) -> str:
+        return subprocess.run([self.binary, '--version'], capture_output=True, text=True).stdout
+
+    def _user_args(self) -> list:
+        # mysqld refuses to run as root unless told to
+        return ['--user=root'] if hasattr(os, 'geteuid') and os.geteuid() == 0 else []
+
+    def _initialize(self, datadir: str):
+        if self.is_mariadb:
+            install_db = shutil.which('mariadb-install-db') or shutil.which('mysql_install_db')
+            if not install_db:
+                raise RuntimeError("mariadb-install-db not found")
+            command = [install_db, f'--datadir={datadir}', '--auth-root-authentication-method=normal',
+                       '--skip-test-db', *self._user_args()]
+        else:
+            command = [self.binary, '--no-defaults', '--initialize-insecure', f'--datadir={datadir}', *self._user_args()]
+        subprocess.run(command, check=True, capture_output=True)
+
+    def start(self) -> "LocalMySQL":
+        self.base_dir = tempfile.mkdtemp(prefix='zeni-bench-mysql-')
+        datadir = os.path.join(self.base_dir, 'data')
+        os.makedirs(datadir)
+        self._initialize(datadir)
+
+        command = [
+            self.binary, '--no-defaults', f'--datadir={datadir}', f'--port={self.port}',
+            '--bind-address=127.0.0.1', f"--socket={os.path.join(self.base_dir, 'mysql.sock')}",
+            f"--pid-file={os.path.join(self.base_dir, 'mysql.pid')}",
+            f"--log-error={os.path.join(self.base_dir, 'error.log')}",
+            '--skip-log-bin', '--max-connections=500', *self._user_args(),
+        ]
+        if not self.is_mariadb:
+            command.append('--mysqlx=OFF')
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self._wait_until_ready()
+        return self
+
+    def _connect(self, **kwargs):
+        import mysql.connector
+        return mysql.connector.connect(host='127.0.0.1', port=self.port, user='root', password='', **kwargs)
+
+    def _wait_until_ready(self):
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Database server exited early, see {self.base_dir}/error.log")
+            try:
+                connection = self._connect()
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Database server did not start within {self.startup_timeout}s")
+                time.sleep(0.25)
+        cursor = connection.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.database} CHARACTER SET utf8mb4")
+        cursor.close()
+        connection.close()
+
+    def env(self) -> dict:
+        return {
+            'MYSQL_HOST': '127.0.0.1',
+            'MYSQL_PORT': str(self.port),
+            'MYSQL_USER': 'root',
+            'MYSQL_PASSWORD': '',
+            'MYSQL_DATABASE': self.database,
+        }
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        if self.base_dir:
+            shutil.rmtree(self.base_dir, ignore_errors=True)
+            self.base_dir = None
+
+    def __enter__(self) -> "LocalMySQL":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    with LocalMySQL() as db:
+        print("Local database running; Ctrl+C to stop")
+        for key, value in db.env().items():
+            print(f"export {key}='{value}'")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the MySQL client and serialization hot paths.
+
+Each benchmark is calibrated to run for at least --min-time per round, repeated
+--rounds times; the report shows min/median/mean/stddev per call and ops/s.
+
+Modes:
+    mock   MySQLClient over an in-memory fake connection: only the Python overhead of
+           pool checkout, SQL lookup, parameter encoding and row handling is measured
+    live   MySQLClient against the MYSQL_* database (or a throwaway one with --local-mysql),
+           so the numbers include the round trip and server time
+
+    python benchmarks/micro_bench.py                        # mock mode, print results
+    python benchmarks/micro_bench.py --save-baseline        # store benchmarks/baselines/micro-mock.json
+    python benchmarks/micro_bench.py --check --threshold 20 # fail if any median regressed > 20%
+    python benchmarks/micro_bench.py --mode live --local-mysql --filter client
+
+Baselines are machine specific: save them on the machine that runs --check.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+BACKEND_DIR = ROOT_DIR / 'backend'
+BASELINE_DIR = Path(__file__).resolve().parent / 'baselines'
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+# Realistic payload sizes: a workout with 8 exercises, a 50-row page, a ~600-char AI reply
+EXERCISES_PER_WORKOUT = 8
+ROWS_PER_PAGE = 50
+AI_RESPONSE = ("Para hipertrofia com nível intermediário, faça 4 séries de 8 a 12 repetições, "
+               "descanso de 60 a 90 segundos e progressão de carga semanal. ") * 4
+
+
+def sample_exercises() -> List[dict]:
+    return [{"name": f"Exercício {i}", "sets": 4, "reps": "10", "rest": "60s"} for i in range(EXERCISES_PER_WORKOUT)]
+
+
+def sample_workout_row(user_id: str, index: int) -> dict:
+    return {
+        "id": f"00000000-0000-7000-8000-{index:012d}",
+        "user_id": user_id,
+        "title": f"Treino {index}",
+        "category": "Força",
+        "exercises": json.dumps(sample_exercises()),
+        "duration": "45 min",
+        "difficulty": "Intermediário",
+        "created_by_ai": 0,
+        "created_at": datetime(2024, 1, 1, 12, 0, index % 60),
+    }
+
+
+# Mocked connection: just enough of mysql.connector's connection/cursor API for MySQLClient
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self._rows = []
+
+    def execute(self, query, params=None):
+        if query.lstrip()[:6].upper() == 'SELECT':
+            table = query.split(' FROM ', 1)[1].split(None, 1)[0] if ' FROM ' in query else None
+            self._rows = self.connection.tables.get(table, [{"1": 1}])
+            self.rowcount = len(self._rows)
+        else:
+            self._rows = []
+            self.rowcount = 1
+
+    def executemany(self, query, seq_params):
+        self.rowcount = len(seq_params)
+
+    def fetchone(self):
+        return dict(self._rows[0]) if self._rows else None
+
+    def fetchall(self):
+        # Real cursors hand out fresh row dicts on every query
+        return [dict(row) for row in self._rows]
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return [dict(row) for row in rows]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, tables: Dict[str, List[dict]]):
+        self.tables = tables
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+MOCK_USER = ("00000000-0000-7000-8000-000000000001", "maria@example.com")
+LIVE_USER = ("00000000-0000-7000-8000-00000000bee1", "bench.micro@example.com")
+
+
+def mock_client():
+    from db_pool import ConnectionPool, PoolConfig
+    from mysql_client import MySQLClient
+
+    tables = {
+        'users': [{"id": MOCK_USER[0], "name": "Maria Silva", "email": MOCK_USER[1],
+                   "password": "$2b$12$" + "x" * 53, "created_at": datetime(2024, 1, 1)}],
+        'workouts': [sample_workout_row(MOCK_USER[0], i) for i in range(ROWS_PER_PAGE)],
+    }
+
+    class MockedMySQLClient(MySQLClient):
+        def _create_connection_pool(self, pool_config: PoolConfig):
+            return ConnectionPool(lambda: FakeConnection(tables), pool_config)
+
+    return MockedMySQLClient(PoolConfig("bench")), MOCK_USER
+
+
+def live_client():
+    from mysql_client import MySQLClient
+
+    client = MySQLClient()
+    user_id, email = LIVE_USER
+    client.execute_query("DELETE FROM users WHERE id = %s", (user_id,))
+    client.create_record('users', {"id": user_id, "name": "Bench", "email": email,
+                                   "password": "x", "created_at": datetime.utcnow()})
+    client.execute_query("DELETE FROM workouts WHERE user_id = %s", (user_id,))
+    rows = [sample_workout_row(user_id, i) for i in range(ROWS_PER_PAGE)]
+    for row in rows:
+        row.pop('id')
+    client.create_records('workouts', rows)
+    return client, LIVE_USER
+
+
+# Benchmarks
+
+def client_benchmarks(client, user: Tuple[str, str]) -> List[Tuple[str, Callable[[], object]]]:
+    user_id, email = user
+    message = {"session_id": "bench-session", "user_id": user_id, "message": "Qual treino hoje?",
+               "response": AI_RESPONSE, "timestamp": datetime(2024, 1, 1, 12, 0)}
+    return [
+        ("client.execute_query(SELECT 1)", lambda: client.execute_query("SELECT 1", fetch_one=True)),
+        ("client.create_record(chat_messages)", lambda: client.create_record('chat_messages', dict(message))),
+        ("client.find_one(users by email)", lambda: client.find_one('users', {'email': email})),
+        (f"client.find_all(workouts, {ROWS_PER_PAGE} rows)", lambda: client.find_all('workouts', {'user_id': user_id})),
+    ]
+
+
+def python_benchmarks() -> List[Tuple[str, Callable[[], object]]]:
+    from serializers import json_dumps, model_row
+    from server import ChatMessage, User, WorkoutPlan
+
+    exercises = sample_exercises()
+    workout = WorkoutPlan(user_id="u", title="Treino A", category="Força", exercises=exercises,
+                          duration="45 min", difficulty="Intermediário")
+    chat_message = ChatMessage(session_id="s", user_id="u", message="Qual treino hoje?", response=AI_RESPONSE)
+    page = [sample_workout_row("u", i) for i in range(ROWS_PER_PAGE)]
+    return [
+        ("model User()", lambda: User(name="Maria Silva", email="maria@example.com", password="$2b$12$" + "x" * 53)),
+        ("model WorkoutPlan()", lambda: WorkoutPlan(user_id="u", title="Treino A", category="Força",
+                                                    exercises=exercises, duration="45 min", difficulty="Intermediário")),
+        ("model ChatMessage()", lambda: ChatMessage(session_id="s", user_id="u", message="Qual treino hoje?",
+                                                    response=AI_RESPONSE)),
+        ("model_row(WorkoutPlan)", lambda: model_row(workout)),
+        ("model_row(ChatMessage)", lambda: model_row(chat_message)),
+        (f"json_dumps({ROWS_PER_PAGE} workout rows)", lambda: json_dumps(page)),
+    ]
+
+
+# Runner
+
+def calibrate(fn: Callable[[], object], min_time: float) -> int:
+    """Smallest power-of-two iteration count whose loop takes at least min_time"""
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if time.perf_counter() - started >= min_time or iterations >= 1 << 20:
+            return iterations
+        iterations *= 2
+
+
+def measure(fn: Callable[[], object], rounds: int, min_time: float) -> dict:
+    iterations = calibrate(fn, min_time)
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - started) / iterations)
+    median = statistics.median(per_call)
+    return {
+        "iterations": iterations,
+        "rounds": rounds,
+        "min_us": round(min(per_call) * 1e6, 3),
+        "median_us": round(median * 1e6, 3),
+        "mean_us": round(statistics.fmean(per_call) * 1e6, 3),
+        "stddev_us": round(statistics.stdev(per_call) * 1e6, 3) if rounds > 1 else 0.0,
+        "ops_per_second": round(1 / median, 1) if median else 0.0,
+    }
+
+
+def print_results(results: Dict[str, dict]):
+    header = f"{'benchmark':<40} {'median us':>11} {'min us':>10} {'stddev us':>10} {'ops/s':>12}"
+    print(header)
+    print('-' * len(header))
+    for name, stats in results.items():
+        print(f"{name:<40} {stats['median_us']:>11} {stats['min_us']:>10} {stats['stddev_us']:>10} {stats['ops_per_second']:>12}")
+
+
+def check(results: Dict[str, dict], baseline: dict, threshold: float) -> bool:
+    """Compare medians with the baseline; False if any benchmark got slower than `threshold` percent"""
+    ok = True
+    print(f"\nCompared with baseline from {baseline.get('saved_at')} ({baseline.get('git_revision')}):")
+    for name, stats in results.items():
+        before = baseline['results'].get(name)
+        if not before:
+            print(f"  {'new':<10} {name}")
+            continue
+        delta = (stats['median_us'] - before['median_us']) / before['median_us'] * 100
+        regressed = delta > threshold
+        ok = ok and not regressed
+        print(f"  {'REGRESSION' if regressed else 'ok':<10} {name:<40} {before['median_us']:>10} -> {stats['median_us']:>10} us ({delta:+.1f}%)")
+    return ok
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for MySQLClient and serialization")
+    parser.add_argument('--mode', choices=('mock', 'live'), default='mock')
+    parser.add_argument('--local-mysql', action='store_true', help="live mode against a throwaway local database")
+    parser.add_argument('--filter', default='', help="only benchmarks whose name contains this text")
+    parser.add_argument('--rounds', type=int, default=15)
+    parser.add_argument('--min-time', type=float, default=0.02, help="minimum seconds per round")
+    parser.add_argument('--baseline', help="baseline JSON path (default benchmarks/baselines/micro-<mode>.json)")
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help="fail when a median regressed past --threshold")
+    parser.add_argument('--threshold', type=float, default=20.0, help="allowed slowdown in percent")
+    parser.add_argument('--output', help="also write the results JSON here")
+    args = parser.parse_args(argv)
+
+    database = None
+    try:
+        if args.mode == 'live' and args.local_mysql:
+            from local_mysql import LocalMySQL
+            database = LocalMySQL().start()
+            os.environ.update(database.env())
+            subprocess.run([sys.executable, 'migrate.py'], cwd=BACKEND_DIR, env=dict(os.environ), check=True)
+
+        client, user = mock_client() if args.mode == 'mock' else live_client()
+        benchmarks = client_benchmarks(client, user) + python_benchmarks()
+
+        results = {}
+        for name, fn in benchmarks:
+            if args.filter in name:
+                results[name] = measure(fn, args.rounds, args.min_time)
+        client.connection_pool.close()
+    finally:
+        if database is not None:
+            database.stop()
+
+    print(f"Mode {args.mode}, {args.rounds} rounds, >= {args.min_time}s per round\n")
+    print_results(results)
+
+    report = {
+        "mode": args.mode,
+        "git_revision": git_revision(),
+        "saved_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    baseline_path = Path(args.baseline) if args.baseline else BASELINE_DIR / f"micro-{args.mode}.json"
+    ok = True
+    if args.check:
+        if not baseline_path.exists():
+            print(f"\nNo baseline at {baseline_path}; run with --save-baseline first")
+            return 1
+        ok = check(results, json.loads(baseline_path.read_text()), args.threshold)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        if baseline_path.exists():
+            # Benchmarks filtered out of this run keep their previous baseline
+            previous = json.loads(baseline_path.read_text())["results"]
+            report["results"] = {**previous, **results}
+        baseline_path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"\nBaseline saved to {baseline_path}")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
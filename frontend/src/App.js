@@ -562,20 +562,64 @@ const AIChat = ({ onBack, user }) => {
     setInputMessage('');
     setLoading(true);
 
+    const aiMessageId = Date.now() + 1;
+    let aiMessageAdded = false;
+
     try {
-      const response = await axios.post(`${API}/chat`, {
-        session_id: sessionId,
-        user_id: user.user_id,
-        message: inputMessage
+      // Tokens chegam via Server-Sent Events; a bolha da IA cresce conforme o texto é gerado
+      const response = await fetch(`${API}/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          session_id: sessionId,
+          user_id: user.user_id,
+          message: inputMessage
+        })
       });
 
-      const aiMessage = {
-        id: Date.now() + 1,
-        type: 'ai',
-        message: response.data.response
+      if (!response.ok) {
+        const detail = await response.json().catch(() => ({}));
+        throw { response: { status: response.status, data: detail } };
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+
+      const appendToken = (token) => {
+        if (!aiMessageAdded) {
+          aiMessageAdded = true;
+          setLoading(false);
+          setMessages(prev => [...prev, { id: aiMessageId, type: 'ai', message: token }]);
+          return;
+        }
+        setMessages(prev => prev.map(msg => (
+          msg.id === aiMessageId ? { ...msg, message: msg.message + token } : msg
+        )));
       };
 
-      setMessages(prev => [...prev, aiMessage]);
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const rawEvent of events) {
+          const lines = rawEvent.split('\n');
+          const eventType = (lines.find(line => line.startsWith('event: ')) || 'event: message').slice(7);
+          const dataLine = lines.find(line => line.startsWith('data: '));
+          if (!dataLine) continue;
+          const data = JSON.parse(dataLine.slice(6));
+
+          if (eventType === 'error') {
+            throw { response: { status: 503, data } };
+          }
+          if (eventType === 'message') {
+            appendToken(data.token);
+          }
+        }
+      }
     } catch (error) {
       console.error('Erro no chat:', error);
       let errorMessage = 'Desculpe, a IA está temporariamente indisponível.';
@@ -585,11 +629,11 @@ const AIChat = ({ onBack, user }) => {
       }
       
       const aiErrorMessage = {
-        id: Date.now() + 1,
+        id: aiMessageId,
         type: 'ai',
         message: `🚧 ${errorMessage}\n\nPor favor, use a criação manual de treinos por enquanto. Voltamos em breve! 💪`
       };
-      setMessages(prev => [...prev, aiErrorMessage]);
+      setMessages(prev => [...prev.filter(msg => msg.id !== aiMessageId), aiErrorMessage]);
     } finally {
       setLoading(false);
     }
@@ -56,18 +56,13 @@ CREATE TABLE IF NOT EXISTS workouts (
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
--- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
-CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_token ON password_reset_tokens(token);
-CREATE INDEX IF NOT EXISTS idx_password_reset_tokens_user_id ON password_reset_tokens(user_id);
-CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id ON chat_messages(session_id);
-CREATE INDEX IF NOT EXISTS idx_chat_messages_user_id ON chat_messages(user_id);
-CREATE INDEX IF NOT EXISTS idx_workouts_user_id ON workouts(user_id);
+-- Indexes are managed by backend/migrate.py (MySQL has no CREATE INDEX IF NOT EXISTS).
+-- Run `python migrate.py` from backend/ after loading this file.
 
 -- Insert sample data for testing (optional)
---INSERT INTO users (name, email, password) VALUES 
---(name, email, password)
-ON DUPLICATE KEY UPDATE name = VALUES(name);
+-- INSERT INTO users (name, email, password) VALUES
+-- (name, email, password)
+-- ON DUPLICATE KEY UPDATE name = VALUES(name);
 
 -- Verify tables were created
 SELECT TABLE_NAME, TABLE_SCHEMA
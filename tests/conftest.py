@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# Os módulos do backend se importam pelo nome (ex.: `from metrics import ...`), como em server.py
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
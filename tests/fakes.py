@@ -0,0 +1,231 @@
+"""Conexões e pools falsos para testar os clientes MySQL sem servidor.
+
+O "banco" é só uma função handler(query, params) que devolve uma lista de linhas
+(SELECT) ou o número de linhas afetadas; cada conexão registra em `events` os comandos
+e commits/rollbacks que recebeu.
+"""
+
+import asyncio
+from collections import deque
+
+import aiomysql
+from mysql.connector import Error as SyncError
+
+
+class FakeDatabase:
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda query, params: [] if query.lstrip().upper().startswith('SELECT') else 1)
+        self.statements = []
+
+    def run(self, query, params):
+        self.statements.append((query, params))
+        return self.handler(query, params)
+
+
+def _rows_and_count(result):
+    if isinstance(result, list):
+        return [dict(row) for row in result], len(result)
+    return [], result
+
+
+class FakeAsyncCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self._rows = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query, params=None):
+        self.connection.events.append(('execute', query, params))
+        self._rows, self.rowcount = _rows_and_count(self.connection.database.run(query, params))
+
+    async def executemany(self, query, seq_params):
+        self.connection.events.append(('executemany', query, list(seq_params)))
+        self.rowcount = 0
+        for params in seq_params:
+            self.rowcount += _rows_and_count(self.connection.database.run(query, params))[1]
+
+    async def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    async def fetchall(self):
+        return list(self._rows)
+
+    async def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+
+class FakeAsyncConnection:
+    """O bastante da aiomysql.Connection para o AsyncMySQLClient"""
+
+    def __init__(self, database: FakeDatabase):
+        self.database = database
+        self.events = []
+        self.closed = False
+        self.ping_fails = False
+        self.last_usage = asyncio.get_running_loop().time()
+
+    def cursor(self, *cursor_classes):
+        return FakeAsyncCursor(self)
+
+    async def begin(self):
+        self.events.append('begin')
+
+    async def commit(self):
+        self.events.append('commit')
+
+    async def rollback(self):
+        self.events.append('rollback')
+
+    async def ping(self, reconnect=True):
+        self.events.append('ping')
+        if self.ping_fails:
+            raise aiomysql.OperationalError(2006, "MySQL server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncPool:
+    """Imita aiomysql.Pool: `size` conexões abertas, `freesize` ociosas"""
+
+    def __init__(self, database: FakeDatabase = None, maxsize: int = 10):
+        self.database = database or FakeDatabase()
+        self.maxsize = maxsize
+        self.free = deque()
+        self.used = []
+        self.opened = []
+        self._released = asyncio.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self.free) + len(self.used)
+
+    @property
+    def freesize(self) -> int:
+        return len(self.free)
+
+    async def acquire(self):
+        async with self._released:
+            while not self.free and self.size >= self.maxsize:
+                await self._released.wait()
+        if self.free:
+            connection = self.free.pop()
+        else:
+            connection = FakeAsyncConnection(self.database)
+            self.opened.append(connection)
+        self.used.append(connection)
+        return connection
+
+    def release(self, connection):
+        self.used.remove(connection)
+        if not connection.closed:
+            self.free.append(connection)
+
+        async def wakeup():
+            async with self._released:
+                self._released.notify()
+
+        return asyncio.ensure_future(wakeup())
+
+    def close(self):
+        for connection in self.free:
+            connection.close()
+
+    async def wait_closed(self):
+        pass
+
+
+def async_client(database: FakeDatabase = None, pool_config=None, maxsize: int = 10):
+    """AsyncMySQLClient com um FakeAsyncPool no lugar do pool do aiomysql (deve rodar dentro do loop)"""
+    from async_mysql_client import AsyncMySQLClient
+    from db_pool import PoolConfig
+
+    client = AsyncMySQLClient(pool_config or PoolConfig("test_async_pool"))
+    client.connection_pool = FakeAsyncPool(database, maxsize)
+    return client
+
+
+# Versão síncrona, no formato do mysql.connector
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = -1
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.connection.events.append(('execute', query, params))
+        self._rows, self.rowcount = _rows_and_count(self.connection.database.run(query, params))
+
+    def executemany(self, query, seq_params):
+        self.connection.events.append(('executemany', query, list(seq_params)))
+        self.rowcount = 0
+        for params in seq_params:
+            self.rowcount += _rows_and_count(self.connection.database.run(query, params))[1]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchmany(self, size):
+        rows, self._rows = self._rows[:size], self._rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """O bastante da conexão do mysql.connector para o MySQLClient e o ConnectionPool"""
+
+    def __init__(self, database: FakeDatabase = None):
+        self.database = database or FakeDatabase()
+        self.events = []
+        self.closed = False
+        self.ping_fails = False
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        self.events.append('begin')
+
+    def commit(self):
+        self.events.append('commit')
+
+    def rollback(self):
+        self.events.append('rollback')
+
+    def consume_results(self):
+        pass
+
+    def ping(self, reconnect=False):
+        self.events.append('ping')
+        if self.ping_fails:
+            raise SyncError("MySQL server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+def sync_client(database: FakeDatabase = None, pool_config=None):
+    """MySQLClient cujo pool abre FakeConnections sobre `database`"""
+    from db_pool import ConnectionPool, PoolConfig
+    from mysql_client import MySQLClient
+
+    database = database or FakeDatabase()
+
+    class FakeMySQLClient(MySQLClient):
+        def _create_connection_pool(self, config):
+            return ConnectionPool(lambda: FakeConnection(database), config)
+
+    return FakeMySQLClient(pool_config or PoolConfig("test_pool"))
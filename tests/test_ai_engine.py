@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+import pytest
+
+from ai_engine import AIResponder, AIResponseTimeout, ResponseEngine, StubEngine, load_engine
+
+
+class SlowEngine(ResponseEngine):
+    """Motor assíncrono que conta as chamadas e segura cada geração até `release` ser liberado"""
+
+    name = "slow"
+
+    def __init__(self):
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self.release = None
+
+    async def generate(self, message, context):
+        self.calls += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+        finally:
+            self.running -= 1
+        return f"resposta: {message}"
+
+
+def test_identical_requests_share_one_generation():
+    async def scenario():
+        engine = SlowEngine()
+        engine.release = asyncio.Event()
+        responder = AIResponder(engine, timeout=5, max_concurrency=4)
+        requests = [asyncio.ensure_future(responder.respond('oi', [('a', 'b')])) for _ in range(3)]
+        await asyncio.sleep(0)
+        engine.release.set()
+        return await asyncio.gather(*requests), engine, responder.stats()
+
+    responses, engine, stats = asyncio.run(scenario())
+    assert responses == ['resposta: oi'] * 3
+    assert engine.calls == 1
+    assert (stats["generated"], stats["coalesced"], stats["in_flight"]) == (1, 2, 0)
+
+
+def test_different_requests_are_limited_by_max_concurrency():
+    async def scenario():
+        engine = SlowEngine()
+        engine.release = asyncio.Event()
+        responder = AIResponder(engine, timeout=5, max_concurrency=2)
+        requests = [asyncio.ensure_future(responder.respond(f'm{i}', [])) for i in range(5)]
+        await asyncio.sleep(0.01)
+        engine.release.set()
+        await asyncio.gather(*requests)
+        return engine
+
+    engine = asyncio.run(scenario())
+    assert engine.calls == 5 and engine.max_running == 2
+
+
+def test_generation_past_the_timeout_raises_and_is_counted():
+    async def scenario():
+        engine = SlowEngine()
+        engine.release = asyncio.Event()
+        responder = AIResponder(engine, timeout=0.01, max_concurrency=1)
+        with pytest.raises(AIResponseTimeout):
+            await responder.respond('oi', [])
+        return responder.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["timeouts"] == 1 and stats["in_flight"] == 0
+
+
+def test_sync_engines_run_in_a_thread():
+    class SyncEngine(ResponseEngine):
+        def generate(self, message, context):
+            return message.upper()
+
+    assert asyncio.run(AIResponder(SyncEngine(), timeout=5, max_concurrency=1).respond('oi', [])) == 'OI'
+
+
+def test_load_engine_defaults_to_the_stub_and_rejects_bad_specs():
+    assert isinstance(load_engine('stub'), StubEngine)
+    with pytest.raises(Exception, match="AI_ENGINE inválido"):
+        load_engine('sem_classe')
+
+
+def test_timed_out_sync_call_keeps_its_slot_until_the_thread_finishes():
+    class BlockingEngine(ResponseEngine):
+        def __init__(self):
+            self.unblock = threading.Event()
+            self.lock = threading.Lock()
+            self.calls = []
+            self.running = 0
+            self.max_running = 0
+
+        def generate(self, message, context):
+            with self.lock:
+                self.calls.append(message)
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            self.unblock.wait(5)
+            with self.lock:
+                self.running -= 1
+            return message
+
+    async def scenario():
+        engine = BlockingEngine()
+        responder = AIResponder(engine, timeout=0.05, max_concurrency=1)
+        with pytest.raises(AIResponseTimeout):
+            await responder.respond('a', [])
+        # A thread de 'a' ainda roda: 'b' espera pela vaga e estoura o timeout sem chamar o motor
+        with pytest.raises(AIResponseTimeout):
+            await responder.respond('b', [])
+        calls_while_blocked = list(engine.calls)
+        engine.unblock.set()
+        return calls_while_blocked, await responder.respond('c', []), engine
+
+    calls_while_blocked, response, engine = asyncio.run(scenario())
+    assert calls_while_blocked == ['a']
+    assert response == 'c'
+    assert engine.max_running == 1
+
+
+def test_stream_over_a_sync_engine_also_keeps_the_slot_after_a_timeout():
+    unblock = threading.Event()
+
+    class BlockingEngine(ResponseEngine):
+        def generate(self, message, context):
+            unblock.wait(5)
+            return message
+
+    async def consume(responder, message):
+        return [token async for token in responder.stream(message, [])]
+
+    async def scenario():
+        responder = AIResponder(BlockingEngine(), timeout=0.05, max_concurrency=1)
+        with pytest.raises(AIResponseTimeout):
+            await consume(responder, 'a')
+        busy = responder._slots.locked()
+        unblock.set()
+        return busy, await consume(responder, 'b')
+
+    busy, tokens = asyncio.run(scenario())
+    assert busy
+    assert tokens == ['b']
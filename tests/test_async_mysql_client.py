@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime
+
+import aiomysql
+import pytest
+
+from db_pool import PoolConfig, PoolTimeout
+from tests.fakes import FakeDatabase, async_client
+
+
+def test_write_commits_and_read_does_not():
+    async def scenario():
+        client = async_client()
+        await client.execute_query("UPDATE users SET name = %s WHERE id = %s", ('Ana', 'u1'))
+        await client.execute_query("SELECT * FROM users", fetch_all=True)
+        return client.connection_pool.opened[0].events
+
+    events = asyncio.run(scenario())
+    assert [event for event in events if event in ('commit', 'rollback')] == ['commit']
+
+
+def test_create_record_generates_id_and_converts_datetime():
+    async def scenario():
+        database = FakeDatabase()
+        client = async_client(database)
+        record_id = await client.create_record('users', {'name': 'Ana', 'created_at': datetime(2024, 1, 2, 3, 4, 5)})
+        return record_id, database.statements
+
+    record_id, statements = asyncio.run(scenario())
+    query, params = statements[0]
+    assert query == "INSERT INTO users (name, created_at, id) VALUES (%s, %s, %s)"
+    assert params == ('Ana', '2024-01-02T03:04:05', record_id)
+    assert record_id[14] == '7'
+
+
+def test_find_one_returns_first_row():
+    rows = [{'id': 'u1', 'email': 'ana@example.com'}]
+
+    async def scenario():
+        database = FakeDatabase(lambda query, params: rows if params == ('ana@example.com',) else [])
+        client = async_client(database)
+        return (await client.find_one('users', {'email': 'ana@example.com'}),
+                await client.find_one('users', {'email': 'bia@example.com'}))
+
+    found, missing = asyncio.run(scenario())
+    assert found == rows[0]
+    assert missing is None
+
+
+def test_database_error_rolls_back_and_names_the_query_shape():
+    def handler(query, params):
+        raise aiomysql.OperationalError(1205, "Lock wait timeout exceeded")
+
+    async def scenario():
+        client = async_client(FakeDatabase(handler))
+        with pytest.raises(Exception) as error:
+            await client.update_record('users', 'u1', {'name': 'Ana'})
+        return error.value, client
+
+    error, client = asyncio.run(scenario())
+    assert "UPDATE users [id]" in str(error)
+    assert isinstance(error.__cause__, aiomysql.OperationalError)
+    connection = client.connection_pool.opened[0]
+    assert 'rollback' in connection.events
+    # A conexão volta para o pool mesmo com erro
+    assert client.connection_pool.freesize == 1
+
+
+def test_acquire_times_out_when_pool_is_exhausted():
+    async def scenario():
+        client = async_client(pool_config=PoolConfig("test_async_pool", size=1, max_overflow=0, timeout=0.05), maxsize=1)
+        async with client.acquire():
+            with pytest.raises(PoolTimeout):
+                await client.execute_query("SELECT 1", fetch_one=True)
+        return client.pool_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["timeouts"] == 1
+    assert stats["waiters"] == 0
+    assert stats["in_use"] == 0
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+
+from starlette.requests import Request
+
+import server
+from cache import RenderedResponseCache, TTLCache, etag_matches, make_etag
+from tests.fakes import FakeDatabase, async_client
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    evicted = []
+    cache = TTLCache(2, ttl=60, on_evict=lambda key, value: evicted.append(key))
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert 'b' not in cache and cache.get('a') == 1 and cache.get('c') == 3
+    assert evicted == ['b']
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(10, ttl=60)
+    cache.set('a', 1, ttl=-1)
+    assert cache.get('a') is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_if_none_match_uses_weak_comparison():
+    etag = make_etag(b'[]')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'W/{etag}', etag)
+    assert etag_matches(f'"outro", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"outro"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_invalidate_drops_every_variant_of_the_key():
+    cache = RenderedResponseCache(max_keys=10, ttl=60)
+    cache.put('u1', 'page1', b'[1]', {}, cache.begin())
+    cache.put('u1', 'page2', b'[2]', {}, cache.begin())
+    assert cache.get('u1', 'page2')[1] == b'[2]'
+    cache.invalidate('u1')
+    assert cache.get('u1', 'page1') is None and cache.get('u1', 'page2') is None
+
+
+def test_put_started_before_an_invalidation_is_not_stored():
+    cache = RenderedResponseCache(max_keys=10, ttl=60)
+    version = cache.begin()
+    cache.invalidate('u1')
+    etag, body, _ = cache.put('u1', 'page1', b'[antigo]', {}, version)
+    assert body == b'[antigo]' and etag == make_etag(b'[antigo]')
+    assert cache.get('u1', 'page1') is None
+
+
+def test_workout_list_revalidates_with_304_and_rereads_after_a_save(monkeypatch):
+    rows = [{'id': 'w1', 'user_id': 'u1', 'title': 'Treino A', 'exercises': '[]', 'created_at': datetime(2024, 1, 1)}]
+
+    async def scenario():
+        database = FakeDatabase(lambda query, params: rows if query.startswith('SELECT') else 1)
+        monkeypatch.setattr(server, 'mysql_client', async_client(database))
+        monkeypatch.setattr(server, 'workout_list_cache', RenderedResponseCache(max_keys=10, ttl=60))
+
+        def request(if_none_match=None):
+            headers = [(b'if-none-match', if_none_match.encode())] if if_none_match else []
+            return Request({'type': 'http', 'method': 'GET', 'headers': headers})
+
+        async def get(if_none_match=None):
+            return await server.get_user_workouts('u1', request(if_none_match), limit=50, cursor=None,
+                                                  fields=None, order='desc')
+
+        first = await get()
+        etag = first.headers['etag']
+        revalidated = await get(f'W/{etag}')
+        selects = sum(query.startswith('SELECT') for query, _ in database.statements)
+
+        await server.save_workout(server.WorkoutPlan(user_id='u1', title='Treino B', category='Força',
+                                                     exercises=[], duration='30 min', difficulty='Iniciante'))
+        await get(etag)
+        return first, revalidated, selects, sum(query.startswith('SELECT') for query, _ in database.statements)
+
+    first, revalidated, selects, selects_after_save = asyncio.run(scenario())
+    assert first.status_code == 200 and first.body.startswith(b'[{"id":"w1"')
+    assert revalidated.status_code == 304
+    assert selects == 1
+    # POST /workouts invalida a lista do usuário: a próxima leitura volta ao banco
+    assert selects_after_save == 2
@@ -0,0 +1,64 @@
+import asyncio
+
+from chat_context import ChatContextCache
+
+
+class ChatHistory:
+    """Cliente falso com find_page devolvendo as mensagens da mais nova para a mais antiga"""
+
+    def __init__(self, turns):
+        self.turns = list(turns)
+        self.loads = 0
+
+    async def find_page(self, table, filter_dict, sort_column, limit, columns):
+        self.loads += 1
+        await asyncio.sleep(0)
+        rows = [{'message': message, 'response': response} for message, response in reversed(self.turns)]
+        return rows[:limit], None
+
+
+def test_first_get_loads_recent_turns_oldest_first_and_then_stays_in_memory():
+    async def scenario():
+        history = ChatHistory([(f'm{i}', f'r{i}') for i in range(5)])
+        cache = ChatContextCache(history, max_turns=3, max_sessions=10, max_bytes=10_000)
+        first = await cache.get('s1')
+        cache.append('s1', 'm5', 'r5')
+        return first, await cache.get('s1'), history.loads
+
+    first, second, loads = asyncio.run(scenario())
+    assert first == [('m2', 'r2'), ('m3', 'r3'), ('m4', 'r4')]
+    assert second == [('m3', 'r3'), ('m4', 'r4'), ('m5', 'r5')]
+    assert loads == 1
+
+
+def test_concurrent_gets_share_one_load():
+    async def scenario():
+        history = ChatHistory([('oi', 'olá')])
+        cache = ChatContextCache(history, max_turns=5, max_sessions=10, max_bytes=10_000)
+        results = await asyncio.gather(*(cache.get('s1') for _ in range(5)))
+        return results, history.loads
+
+    results, loads = asyncio.run(scenario())
+    assert loads == 1
+    assert all(result == [('oi', 'olá')] for result in results)
+
+
+def test_sessions_are_evicted_lru_by_count_and_bytes_are_tracked():
+    async def scenario():
+        cache = ChatContextCache(ChatHistory([('a', 'b')]), max_turns=5, max_sessions=2, max_bytes=10_000)
+        for session_id in ('s1', 's2'):
+            await cache.get(session_id)
+        await cache.get('s1')
+        await cache.get('s3')
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert list(cache._sessions) == ['s1', 's3']
+    assert cache.evictions == 1
+    assert cache.bytes == sum(cache._sizes.values())
+
+
+def test_append_ignores_sessions_that_are_not_cached():
+    cache = ChatContextCache(ChatHistory([]), max_turns=5, max_sessions=10, max_bytes=10_000)
+    cache.append('s1', 'oi', 'olá')
+    assert cache.stats()["sessions"] == 0 and cache.bytes == 0
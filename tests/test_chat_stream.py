@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import server
+from ai_engine import AIResponder, ResponseEngine, StubEngine
+from chat_context import ChatContextCache
+
+
+class Writes:
+    """write_buffer falso que só guarda as linhas recebidas"""
+
+    def __init__(self):
+        self.rows = []
+
+    async def write(self, table, columns, values):
+        self.rows.append((table, dict(zip(columns, values))))
+
+
+class EmptyHistory:
+    async def find_page(self, *args, **kwargs):
+        return [], None
+
+
+def parse(chunks):
+    events = []
+    for chunk in chunks:
+        lines = chunk.decode().strip().split('\n')
+        event = lines[0][len('event: '):] if lines[0].startswith('event: ') else 'message'
+        events.append((event, json.loads(lines[-1][len('data: '):])))
+    return events
+
+
+def run_stream(monkeypatch, engine, timeout=5):
+    writes = Writes()
+    monkeypatch.setattr(server, 'ai_responder', AIResponder(engine, timeout=timeout, max_concurrency=1))
+    monkeypatch.setattr(server, 'chat_context', ChatContextCache(EmptyHistory(), max_turns=5, max_sessions=10,
+                                                                 max_bytes=10_000))
+    monkeypatch.setattr(server, 'write_buffer', writes)
+    request = server.ChatRequest(session_id='s1', user_id='u1', message='bom dia')
+
+    async def collect():
+        return [chunk async for chunk in server.stream_chat_response(request)]
+
+    return parse(asyncio.run(collect())), writes.rows
+
+
+def test_tokens_arrive_one_event_each_and_the_full_response_is_saved(monkeypatch):
+    events, rows = run_stream(monkeypatch, StubEngine(latency=0))
+
+    tokens = [data['token'] for event, data in events if event == 'message']
+    assert ''.join(tokens) == 'Resposta da IA para: bom dia'
+    assert len(tokens) == 6
+    event, done = events[-1]
+    assert event == 'done' and done['response'] == 'Resposta da IA para: bom dia'
+    (table, row), = rows
+    assert table == 'chat_messages'
+    assert (row['id'], row['session_id'], row['response']) == (done['id'], 's1', done['response'])
+
+
+def test_timeout_sends_an_error_event_and_saves_nothing(monkeypatch):
+    class Stuck(ResponseEngine):
+        async def stream(self, message, context):
+            await asyncio.sleep(10)
+            yield 'nunca'
+
+    events, rows = run_stream(monkeypatch, Stuck(), timeout=0.01)
+    assert [event for event, _ in events] == ['error']
+    assert rows == []
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+import pytest
+
+from db_pool import ConnectionPool, PoolConfig, PoolTimeout
+from tests.fakes import FakeConnection, async_client
+
+
+def make_pool(**config):
+    opened = []
+
+    def connect():
+        connection = FakeConnection()
+        opened.append(connection)
+        return connection
+
+    return ConnectionPool(connect, PoolConfig("test_pool", **config)), opened
+
+
+def test_times_out_when_every_connection_is_in_use():
+    pool, _ = make_pool(size=1, max_overflow=0, timeout=0.05)
+    pool.get_connection()
+    with pytest.raises(PoolTimeout):
+        pool.get_connection()
+    snapshot = pool.snapshot()
+    assert snapshot["timeouts"] == 1
+    assert snapshot["waiters"] == 0
+    assert snapshot["in_use"] == 1
+
+
+def test_waiter_gets_the_connection_released_by_another_thread():
+    pool, opened = make_pool(size=1, max_overflow=0, timeout=5)
+    connection = pool.get_connection()
+    threading.Timer(0.05, pool.release, (connection,)).start()
+    assert pool.get_connection() is connection
+    assert len(opened) == 1
+
+
+def test_overflow_connections_are_closed_on_release():
+    pool, opened = make_pool(size=1, max_overflow=1)
+    first, second = pool.get_connection(), pool.get_connection()
+    pool.release(first)
+    pool.release(second)
+    assert [connection.closed for connection in opened] == [False, True]
+    snapshot = pool.snapshot()
+    assert (snapshot["idle"], snapshot["in_use"], snapshot["overflow"]) == (1, 0, 0)
+
+
+def test_connections_older_than_recycle_are_reopened():
+    pool, opened = make_pool(size=1, recycle=60)
+    connection = pool.get_connection()
+    pool.release(connection)
+    pool._created_at[id(connection)] -= 61
+    assert pool.get_connection() is not connection
+    assert connection.closed
+    assert pool.snapshot()["discarded"] == 1
+
+
+def test_pre_ping_is_off_by_default():
+    pool, _ = make_pool(size=1)
+    connection = pool.get_connection()
+    pool.release(connection)
+    pool._idle_since[id(connection)] -= 3600
+    pool.get_connection()
+    assert 'ping' not in connection.events
+
+
+def test_pre_ping_only_checks_connections_idle_past_the_threshold():
+    pool, _ = make_pool(size=1, pre_ping=True, pre_ping_idle=30)
+    connection = pool.get_connection()
+    pool.release(connection)
+    assert pool.get_connection() is connection
+    assert 'ping' not in connection.events
+
+    pool.release(connection)
+    pool._idle_since[id(connection)] -= 31
+    connection.ping_fails = True
+    replacement = pool.get_connection()
+    assert connection.events.count('ping') == 1
+    assert replacement is not connection and connection.closed
+
+
+def test_async_pre_ping_skips_recently_used_connections():
+    async def scenario():
+        client = async_client(pool_config=PoolConfig("test_async_pool", pre_ping=True, pre_ping_idle=30))
+        async with client.acquire() as connection:
+            pass
+        async with client.acquire():
+            pass
+        recent = connection.events.count('ping')
+        connection.last_usage -= 31
+        async with client.acquire():
+            pass
+        return recent, connection.events.count('ping')
+
+    assert asyncio.run(scenario()) == (0, 1)
+
+
+def test_async_overflow_connections_are_closed_on_release():
+    async def scenario():
+        client = async_client(pool_config=PoolConfig("test_async_pool", size=1, max_overflow=2))
+        async with client.acquire():
+            async with client.acquire():
+                pass
+        await asyncio.sleep(0)
+        return client.connection_pool, client.pool_stats()
+
+    pool, stats = asyncio.run(scenario())
+    assert [connection.closed for connection in pool.opened] == [True, False]
+    assert (stats["idle"], stats["in_use"], stats["overflow"]) == (1, 0, 0)
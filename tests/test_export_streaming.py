@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import orjson
+
+import server
+from tests.fakes import FakeDatabase, async_client, sync_client
+
+ROWS = [{'id': f'm{i}', 'session_id': 's1', 'message': f'pergunta {i}'} for i in range(7)]
+
+
+def export_database():
+    return FakeDatabase(lambda query, params: ROWS if params == ('s1',) else [])
+
+
+def test_async_iter_all_streams_in_batches_and_releases_the_connection():
+    async def scenario():
+        client = async_client(export_database())
+        rows = [row async for row in client.iter_all('chat_messages', {'session_id': 's1'}, batch_size=3,
+                                                     order_by='timestamp')]
+        return rows, client.connection_pool
+
+    rows, pool = asyncio.run(scenario())
+    assert rows == ROWS
+    query = pool.opened[0].events[-1][1]
+    assert query == "SELECT * FROM chat_messages WHERE session_id = %s ORDER BY timestamp, id"
+    assert pool.freesize == 1
+
+
+def test_sync_iter_all_releases_the_connection_when_abandoned():
+    client = sync_client(export_database())
+    rows = client.iter_all('chat_messages', {'session_id': 's1'}, batch_size=2)
+    assert next(rows) == ROWS[0]
+    assert client.pool_stats()["in_use"] == 1
+    rows.close()
+    assert client.pool_stats()["in_use"] == 0
+
+
+def test_stream_ndjson_writes_one_json_document_per_line():
+    async def rows():
+        yield {'id': 'w1', 'exercises': '[{"name": "Prancha"}]'}
+        yield {'id': 'w2', 'exercises': bytearray(b'[]')}
+
+    async def collect():
+        return b''.join([chunk async for chunk in server.stream_ndjson(rows(), server.WORKOUT_JSON_COLUMNS)])
+
+    lines = asyncio.run(collect()).splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'id': 'w1', 'exercises': [{'name': 'Prancha'}]},
+        {'id': 'w2', 'exercises': []},
+    ]
+    assert orjson.loads(lines[0])['exercises'][0]['name'] == 'Prancha'
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+
+from benchmarks import load_test  # noqa: E402
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert load_test.percentile(values, 0.50) == 50.0
+    assert load_test.percentile(values, 0.99) == 99.0
+    assert load_test.percentile([], 0.95) == 0.0
+
+
+def test_summarize_reports_milliseconds_and_throughput():
+    stats = load_test.summarize([0.003, 0.001, 0.002], errors=1, elapsed=2.0)
+    assert (stats["requests"], stats["errors"], stats["throughput_rps"]) == (3, 1, 1.5)
+    assert (stats["p50_ms"], stats["max_ms"], stats["mean_ms"]) == (2.0, 3.0, 2.0)
+
+
+def run(p95_ms, throughput_rps):
+    route = {"requests": 100, "p50_ms": 5.0, "p95_ms": p95_ms, "p99_ms": 20.0, "throughput_rps": throughput_rps}
+    return {"result": {"routes": {"POST /api/login": route}, "total": route}}
+
+
+def test_compare_flags_p95_and_throughput_regressions(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(run(p95_ms=10.0, throughput_rps=100.0)))
+    assert load_test.compare(run(p95_ms=10.5, throughput_rps=98.0), str(baseline), threshold=10)
+    assert not load_test.compare(run(p95_ms=12.0, throughput_rps=100.0), str(baseline), threshold=10)
+    assert not load_test.compare(run(p95_ms=10.0, throughput_rps=80.0), str(baseline), threshold=10)
@@ -0,0 +1,49 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import metrics
+from metrics import Registry, db_query_seconds, observe_query
+from request_metrics import RequestMetricsMiddleware, http_in_flight, http_responses
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    latency = registry.histogram("job_seconds", "Duração", ("kind",), buckets=(0.1, 1.0))
+    done = registry.counter("jobs_total", "Jobs", ("kind",))
+    latency.labels('a"b').observe(0.5)
+    done.inc('a"b', amount=2)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE job_seconds histogram" in lines
+    assert 'job_seconds_bucket{kind="a\\"b",le="1.0"} 1' in lines
+    assert 'job_seconds_count{kind="a\\"b"} 1' in lines
+    assert 'jobs_total{kind="a\\"b"} 2' in lines
+
+
+def test_query_metrics_are_labeled_by_table_and_filters_not_raw_sql():
+    before = db_query_seconds.labels("SELECT workouts [user_id]").count
+    observe_query("SELECT * FROM workouts WHERE user_id = %s ORDER BY created_at DESC LIMIT %s",
+                  ('u1', 51), 0.002, 3)
+    observe_query("SELECT  *  FROM workouts WHERE user_id = %s LIMIT %s", ('u2', 11), 0.001, 0)
+    assert db_query_seconds.labels("SELECT workouts [user_id]").count == before + 2
+    assert not any('%s' in shape for shape, in db_query_seconds._children)
+
+
+def test_middleware_records_route_templates_and_status():
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/itens/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/itens/1")
+    client.get("/itens/2")
+    client.get("/nada")
+
+    counts = dict(http_responses._values)
+    assert counts[("GET", "/itens/{item_id}", "200")] >= 2
+    assert counts[("GET", "unmatched", "404")] >= 1
+    assert http_in_flight.value == 0
+    assert 'http_request_duration_seconds_count{method="GET",route="/itens/{item_id}"}' in metrics.registry.render()
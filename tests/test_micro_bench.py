@@ -0,0 +1,22 @@
+from benchmarks import micro_bench
+
+
+def test_every_benchmark_runs_against_the_mocked_client():
+    client, user = micro_bench.mock_client()
+    benchmarks = dict(micro_bench.client_benchmarks(client, user) + micro_bench.python_benchmarks())
+    results = {name: fn() for name, fn in benchmarks.items()}
+    assert results["client.find_one(users by email)"]["email"] == user[1]
+    assert len(results[f"client.find_all(workouts, {micro_bench.ROWS_PER_PAGE} rows)"]) == micro_bench.ROWS_PER_PAGE
+
+
+def test_measure_reports_per_call_statistics():
+    stats = micro_bench.measure(lambda: sum(range(10)), rounds=3, min_time=0.001)
+    assert stats["rounds"] == 3 and stats["iterations"] >= 1
+    assert stats["min_us"] <= stats["median_us"]
+    assert stats["ops_per_second"] > 0
+
+
+def test_check_flags_benchmarks_slower_than_the_threshold():
+    baseline = {"results": {"a": {"median_us": 10.0}, "b": {"median_us": 10.0}}}
+    assert micro_bench.check({"a": {"median_us": 10.5}, "new": {"median_us": 1.0}}, baseline, threshold=10)
+    assert not micro_bench.check({"b": {"median_us": 12.0}}, baseline, threshold=10)
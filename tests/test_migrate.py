@@ -0,0 +1,105 @@
+import migrate
+from tests.fakes import FakeDatabase, sync_client
+
+
+class SchemaMigrations:
+    """Handler que guarda as versões inseridas em schema_migrations e responde ao EXPLAIN"""
+
+    def __init__(self, applied=(), plan_type='ref'):
+        self.applied = set(applied)
+        self.plan_type = plan_type
+
+    def __call__(self, query, params):
+        if query.startswith("SELECT version FROM schema_migrations"):
+            return [{'version': version} for version in sorted(self.applied)]
+        if query.startswith("INSERT INTO schema_migrations"):
+            self.applied.add(params[0])
+            return 1
+        if query.startswith("EXPLAIN"):
+            return [{'table': 'workouts', 'type': self.plan_type, 'key': 'idx_workouts_user_created'}]
+        return 0
+
+
+def use_database(monkeypatch, handler):
+    monkeypatch.setattr(migrate, 'mysql_client', sync_client(FakeDatabase(handler)))
+
+
+def test_migrate_applies_only_pending_versions_in_order(monkeypatch):
+    calls = []
+    monkeypatch.setattr(migrate, 'MIGRATIONS', [
+        (1, "one", lambda: calls.append(1)),
+        (2, "two", lambda: calls.append(2)),
+        (3, "three", lambda: calls.append(3)),
+    ])
+    schema = SchemaMigrations(applied={1})
+    use_database(monkeypatch, schema)
+
+    assert migrate.migrate() == 2
+    assert calls == [2, 3]
+    assert schema.applied == {1, 2, 3}
+    assert migrate.migrate() == 0
+
+
+def test_verify_query_plans_fails_on_full_table_scans(monkeypatch):
+    use_database(monkeypatch, SchemaMigrations())
+    assert migrate.verify_query_plans()
+
+    use_database(monkeypatch, SchemaMigrations(plan_type='ALL'))
+    assert not migrate.verify_query_plans()
+
+
+def test_query_shapes_match_what_the_clients_send():
+    from sql_builder import page_statement, select_statement
+
+    shapes = {query for _, query, _ in migrate.query_shapes()}
+    assert select_statement('users', {'email': 'x'})[0] in shapes
+    assert page_statement('workouts', {'user_id': 'u1'}, 'created_at', 50, None, None, True)[0] in shapes
+    assert page_statement('chat_messages', {'session_id': 's1'}, 'timestamp', 50, ('t', 'id'), None, False)[0] in shapes
+
+
+class UUIDColumns:
+    """Handler com o estado de information_schema.columns para as chaves UUID"""
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def __call__(self, query, params):
+        if 'key_column_usage' in query:
+            return []
+        if 'table_constraints' in query:
+            return [{'total': 1}]
+        if 'DATA_TYPE' in query:
+            return [{'data_type': self.columns[params][0]}]
+        if 'CHARACTER_MAXIMUM_LENGTH' in query:
+            return [{'length': self.columns[params][1]}]
+        return 0
+
+
+def test_m0003_is_always_registered_in_version_order():
+    assert [version for version, _, _ in migrate.MIGRATIONS] == [1, 2, 3, 4]
+
+
+def test_m0003_is_a_noop_without_binary_mode(monkeypatch):
+    database = FakeDatabase(UUIDColumns({}))
+    monkeypatch.setattr(migrate, 'mysql_client', sync_client(database))
+    monkeypatch.setattr(migrate.uuid_codec, 'enabled', False)
+    migrate.m0003_binary_uuid_keys()
+    assert database.statements == []
+
+
+def test_m0003_resumes_a_run_that_stopped_after_packing(monkeypatch):
+    columns = {(table, column): ('binary', 16) for table, keys in migrate.UUID_KEYS.items() for column in keys}
+    # Execução anterior parou depois do UPDATE: a coluna ficou VARBINARY(36) com valores já empacotados
+    columns[('workouts', 'user_id')] = ('varbinary', 36)
+    database = FakeDatabase(UUIDColumns(columns))
+    monkeypatch.setattr(migrate, 'mysql_client', sync_client(database))
+    monkeypatch.setattr(migrate.uuid_codec, 'enabled', True)
+
+    migrate.m0003_binary_uuid_keys()
+
+    changes = [query for query, _ in database.statements if query.startswith(('ALTER', 'UPDATE'))]
+    assert changes == [
+        "UPDATE workouts SET user_id = UNHEX(REPLACE(user_id, '-', '')) WHERE LENGTH(user_id) = 36",
+        "ALTER TABLE workouts MODIFY user_id BINARY(16) NOT NULL",
+    ]
+    assert not any('UUID_TO_BIN' in query for query, _ in database.statements)
@@ -0,0 +1,79 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from sql_builder import page_result, page_statement
+from tests.fakes import FakeDatabase, async_client, sync_client
+
+ROWS = [{'id': f'w{i}', 'created_at': datetime(2024, 1, 10 - i)} for i in range(5)]
+
+
+def test_page_statement_asks_for_one_extra_row():
+    query, params = page_statement('workouts', {'user_id': 'u1'}, 'created_at', 2, None, None, True)
+    assert query == "SELECT * FROM workouts WHERE user_id = %s ORDER BY created_at DESC, id DESC LIMIT %s"
+    assert params == ('u1', 3)
+
+
+def test_page_statement_with_cursor_and_projection():
+    after = (datetime(2024, 1, 8), 'w2')
+    query, params = page_statement('workouts', {'user_id': 'u1'}, 'created_at', 2, after, ['title'], False)
+    assert query == (
+        "SELECT title, created_at, id FROM workouts WHERE user_id = %s AND "
+        "(created_at > %s OR (created_at = %s AND id > %s)) ORDER BY created_at ASC, id ASC LIMIT %s"
+    )
+    assert params == ('u1', after[0], after[0], 'w2', 3)
+
+
+def test_page_result_cursor_points_at_the_last_returned_row():
+    rows, after = page_result(ROWS[:3], 2, 'created_at')
+    assert rows == ROWS[:2]
+    assert after == (ROWS[1]['created_at'], 'w1')
+
+
+def test_last_page_has_no_cursor():
+    assert page_result(ROWS[:2], 2, 'created_at') == (ROWS[:2], None)
+    assert page_result([], 2, 'created_at') == ([], None)
+
+
+def test_find_page_walks_every_row_once_in_both_clients():
+    def handler(query, params):
+        # Simula o keyset: linhas depois do cursor (ordem decrescente), até LIMIT
+        rows = ROWS
+        if ' OR (' in query:
+            value, _, record_id = params[1:4]
+            rows = [row for row in ROWS if (row['created_at'], row['id']) < (value, record_id)]
+        return rows[:params[-1]]
+
+    sync = sync_client(FakeDatabase(handler))
+    pages, after = [], None
+    while True:
+        rows, after = sync.find_page('workouts', {'user_id': 'u1'}, limit=2, after=after)
+        pages.append([row['id'] for row in rows])
+        if after is None:
+            break
+    assert pages == [['w0', 'w1'], ['w2', 'w3'], ['w4']]
+
+    async def first_page():
+        client = async_client(FakeDatabase(handler))
+        return await client.find_page('workouts', {'user_id': 'u1'}, limit=2)
+
+    rows, after = asyncio.run(first_page())
+    assert [row['id'] for row in rows] == ['w0', 'w1'] and after == (ROWS[1]['created_at'], 'w1')
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    cursor = server.encode_cursor((datetime(2024, 1, 8, 12, 30), 'w2'))
+    assert server.decode_cursor(cursor) == ('2024-01-08T12:30:00', 'w2')
+    assert server.encode_cursor(None) is None and server.decode_cursor(None) is None
+    with pytest.raises(HTTPException) as error:
+        server.decode_cursor('not-a-cursor')
+    assert error.value.status_code == 400
+
+
+def test_parse_fields_rejects_unknown_columns():
+    assert server.parse_fields('title, exercises', server.WorkoutPlan) == ['title', 'exercises']
+    with pytest.raises(HTTPException):
+        server.parse_fields('title,password', server.WorkoutPlan)
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+
+from password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def test_hash_and_verify_round_trip():
+    hasher = PasswordHasher(workers=2)
+
+    async def scenario():
+        hashed = await hasher.hash("s3nha")
+        return hashed, await hasher.verify("s3nha", hashed), await hasher.verify("outra", hashed)
+
+    try:
+        hashed, ok, wrong = asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+    assert hashed.startswith("$2b$")
+    assert ok and not wrong
+    assert hasher.in_flight == 0
+    assert hasher.stats()["hash_seconds"]["count"] == 3
+
+
+def test_rejects_when_workers_and_queue_are_full():
+    hasher = PasswordHasher(workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(hasher._run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy) as busy:
+            await hasher._run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+        return busy.value
+
+    try:
+        busy = asyncio.run(scenario())
+    finally:
+        release.set()
+        hasher.shutdown()
+    assert busy.retry_after >= 1
+    assert hasher.rejected == 1
+    assert hasher.in_flight == 0
@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+
+import server
+from query_profiler import QueryProfiler, describe
+
+
+def test_describe_keeps_operation_table_and_filtered_columns():
+    assert describe("SELECT * FROM workouts WHERE user_id = %s AND (created_at < %s OR id < %s) "
+                    "ORDER BY created_at DESC LIMIT %s") == "SELECT workouts [user_id, created_at, id]"
+    assert describe("INSERT INTO chat_messages (id, message) VALUES (%s, %s)") == "INSERT chat_messages []"
+    assert describe("UPDATE users SET password = %s WHERE id = %s") == "UPDATE users [id]"
+
+
+def test_profiler_aggregates_by_shape_and_sorts():
+    profiler = QueryProfiler(enabled=True, slow_threshold_ms=None, max_shapes=10, max_slow=10)
+    for user_id in ('u1', 'u2'):
+        profiler.record("SELECT * FROM users WHERE id = %s", (user_id,), 0.001, 1)
+    profiler.record("SELECT * FROM workouts WHERE user_id = %s", ('u1',), 0.010, 50)
+    profiler.record_error("SELECT * FROM users WHERE id = %s")
+
+    top = profiler.top(sort="count")
+    assert [shape["shape"] for shape in top] == ["SELECT users [id]", "SELECT workouts [user_id]"]
+    assert (top[0]["count"], top[0]["errors"], top[0]["rows"]) == (2, 1, 2)
+    assert profiler.top(limit=1)[0]["shape"] == "SELECT workouts [user_id]"
+
+
+def test_slow_queries_are_logged_with_redacted_params():
+    profiler = QueryProfiler(enabled=False, slow_threshold_ms=5, max_shapes=10, max_slow=10)
+    profiler.record("SELECT * FROM users WHERE email = %s", ('ana@example.com',), 0.001, 1)
+    profiler.record("SELECT * FROM users WHERE email = %s", ('ana@example.com',), 0.050, 1)
+
+    slow, = profiler.slow_queries()
+    assert slow["params"] == "(<str:15>)"
+    assert 'ana@example.com' not in str(slow)
+    assert profiler.top() == []
+
+
+def test_shape_table_is_bounded():
+    profiler = QueryProfiler(enabled=True, slow_threshold_ms=None, max_shapes=1, max_slow=10)
+    profiler.record("SELECT * FROM users WHERE id = %s", ('u1',), 0.001, 1)
+    profiler.record("SELECT * FROM workouts WHERE id = %s", ('w1',), 0.001, 1)
+    assert profiler.stats()["dropped_shapes"] == 1
+
+
+def test_query_profile_routes_require_the_admin_token(monkeypatch):
+    client = TestClient(server.app)
+
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/api/debug/query-profile").status_code == 404
+    assert client.post("/api/debug/query-profile/reset").status_code == 404
+
+    monkeypatch.setenv("ADMIN_TOKEN", "segredo")
+    assert client.get("/api/debug/query-profile").status_code == 401
+    assert client.post("/api/debug/query-profile/reset", headers={"X-Admin-Token": "errado"}).status_code == 401
+    response = client.get("/api/debug/query-profile", headers={"X-Admin-Token": "segredo"})
+    assert response.status_code == 200 and "shapes" in response.json()
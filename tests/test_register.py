@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import server
+from tests.fakes import FakeDatabase, async_client
+
+
+class UsersTable:
+    """Handler do FakeDatabase que só entende a busca por email e o INSERT de users"""
+
+    def __init__(self, *emails):
+        self.emails = set(emails)
+
+    def __call__(self, query, params):
+        if query.startswith("SELECT * FROM users WHERE email = %s"):
+            return [{'id': 'existing', 'email': params[0]}] if params[0] in self.emails else []
+        if query.startswith("INSERT INTO users"):
+            self.emails.add(params[2])
+            return 1
+        raise AssertionError(f"unexpected query: {query}")
+
+
+@pytest.fixture
+def fast_hash(monkeypatch):
+    async def fake_hash(password):
+        return f"hashed:{password}"
+
+    monkeypatch.setattr(server.password_hasher, "hash", fake_hash)
+
+
+def register(monkeypatch, table, **fields):
+    async def scenario():
+        client = async_client(FakeDatabase(table))
+        monkeypatch.setattr(server, "mysql_client", client)
+        try:
+            return await server.register(server.UserCreate(**fields)), client.connection_pool.opened[0]
+        except HTTPException as error:
+            return error, client.connection_pool.opened[0]
+
+    return asyncio.run(scenario())
+
+
+def test_register_inserts_user_in_one_committed_transaction(monkeypatch, fast_hash):
+    table = UsersTable()
+    result, connection = register(monkeypatch, table, name="Ana", email="ana@example.com", password="s3nha")
+
+    assert result["message"] == "Usuário criado com sucesso"
+    assert result["name"] == "Ana"
+    assert table.emails == {"ana@example.com"}
+    statements = [event for event in connection.events if not isinstance(event, str)]
+    insert = statements[-1]
+    assert insert[1].startswith("INSERT INTO users (id, name, email, password, created_at)")
+    assert insert[2][0] == result["user_id"]
+    assert insert[2][3] == "hashed:s3nha"
+    assert [event for event in connection.events if isinstance(event, str)] == ['begin', 'commit']
+
+
+def test_register_duplicate_email_rolls_back_with_400(monkeypatch, fast_hash):
+    table = UsersTable("ana@example.com")
+    error, connection = register(monkeypatch, table, name="Ana", email="ana@example.com", password="s3nha")
+
+    assert isinstance(error, HTTPException)
+    assert error.status_code == 400
+    assert [event for event in connection.events if isinstance(event, str)] == ['begin', 'rollback']
+    assert not any(event[1].startswith("INSERT") for event in connection.events if not isinstance(event, str))
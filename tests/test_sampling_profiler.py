@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from sampling_profiler import ProfilerBusy, SamplingProfiler
+
+
+def test_profile_returns_collapsed_stacks_including_tasks():
+    async def scenario():
+        profiler = SamplingProfiler()
+
+        async def waiting_task():
+            await asyncio.sleep(1)
+
+        task = asyncio.create_task(waiting_task(), name="espera")
+        result = await profiler.profile(0.05, interval=0.005)
+        task.cancel()
+        return profiler, result
+
+    profiler, result = asyncio.run(scenario())
+    assert result["samples"] >= 1
+    assert "task:espera;waiting_task" in result["collapsed"]
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in result["collapsed"].splitlines())
+    assert profiler.stats()["running"] is False and profiler.runs == 1
+
+
+def test_cancelled_request_keeps_the_profiler_busy_until_sampling_ends():
+    async def scenario():
+        profiler = SamplingProfiler()
+        request = asyncio.ensure_future(profiler.profile(0.2, interval=0.01))
+        await asyncio.sleep(0.02)
+        request.cancel()
+        await asyncio.gather(request, return_exceptions=True)
+        # A thread de coleta ainda está amostrando: uma segunda coleta seria concorrente
+        with pytest.raises(ProfilerBusy):
+            await profiler.profile(0.01)
+        deadline = time.monotonic() + 2
+        while profiler.running and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return await profiler.profile(0.01, interval=0.005)
+
+    assert asyncio.run(scenario())["samples"] >= 1
+
+
+def test_failed_submit_releases_the_profiler():
+    async def scenario():
+        profiler = SamplingProfiler()
+        profiler._executor.shutdown()
+        with pytest.raises(RuntimeError):
+            await profiler.profile(0.01)
+        return profiler.running
+
+    assert asyncio.run(scenario()) is False
@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from serializers import FastJSONResponse, column_plan, json_dumps, model_row, raw_json_columns
+
+
+class Sample(BaseModel):
+    id: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    tags: List[str] = []
+    extra: Optional[dict] = None
+    done: bool = False
+
+
+def test_model_row_converts_each_field_in_declaration_order():
+    sample = Sample(id='s1', created_at=datetime(2024, 1, 2, 3, 4, 5), tags=['a', 'b'], extra={'k': 1})
+    columns, values = model_row(sample)
+    assert columns == ('id', 'created_at', 'finished_at', 'tags', 'extra', 'done')
+    assert values == ('s1', '2024-01-02T03:04:05', None, '["a","b"]', '{"k":1}', False)
+
+
+def test_column_plan_is_computed_once_per_model_class():
+    assert column_plan(Sample) is column_plan(Sample)
+
+
+def test_fast_json_response_renders_rows_models_and_datetimes():
+    sample = Sample(id='s1', created_at=datetime(2024, 1, 2, 3, 4, 5))
+    response = FastJSONResponse({'row': {'at': datetime(2024, 1, 2)}, 'model': sample, 1: 'chave numérica'})
+    assert response.media_type == 'application/json'
+    assert response.body == (
+        b'{"row":{"at":"2024-01-02T00:00:00"},"model":{"id":"s1","created_at":"2024-01-02T03:04:05",'
+        b'"finished_at":null,"tags":[],"extra":null,"done":false},"1":"chave num\xc3\xa9rica"}'
+    )
+
+
+def test_raw_json_columns_pass_stored_json_through_without_reencoding():
+    row = {'id': 'w1', 'exercises': '[{"name": "Prancha", "sets": 3}]', 'notes': bytearray(b'{"a": 1}')}
+    raw_json_columns(row, ('exercises', 'notes', 'missing'))
+    # O texto do banco vai como está: o espaço depois de ":" prova que não houve decode/encode
+    assert json_dumps(row) == b'{"id":"w1","exercises":[{"name": "Prancha", "sets": 3}],"notes":{"a": 1}}'
+
+
+def test_raw_json_columns_leave_decoded_values_alone():
+    row = {'exercises': [{'name': 'Prancha'}]}
+    assert json_dumps(raw_json_columns(row, ('exercises',))) == b'{"exercises":[{"name":"Prancha"}]}'
@@ -0,0 +1,31 @@
+from sql_builder import delete_sql, insert_sql, select_sql, update_sql
+from tests.fakes import FakeDatabase, sync_client
+
+
+def test_same_shape_returns_the_cached_string():
+    assert insert_sql('users', ('id', 'name')) is insert_sql('users', ('id', 'name'))
+    assert select_sql('users', ('email',)) is select_sql('users', ('email',))
+
+
+def test_generated_sql():
+    assert insert_sql('users', ('id', 'name')) == "INSERT INTO users (id, name) VALUES (%s, %s)"
+    assert update_sql('users', ('name', 'password')) == "UPDATE users SET name = %s, password = %s WHERE id = %s"
+    assert delete_sql('users') == "DELETE FROM users WHERE id = %s"
+    assert select_sql('users') == "SELECT * FROM users"
+    assert select_sql('password_reset_tokens', ('token', 'used'), greater_than=('expires_at',)) == (
+        "SELECT * FROM password_reset_tokens WHERE token = %s AND used = %s AND expires_at > %s")
+    assert select_sql('workouts', ('user_id',), 'created_at') == (
+        "SELECT * FROM workouts WHERE user_id = %s ORDER BY created_at, id")
+
+
+def test_sync_client_builds_crud_statements_from_the_cache():
+    database = FakeDatabase()
+    client = sync_client(database)
+    client.update_record('users', 'u1', {'name': 'Ana'})
+    client.delete_record('users', 'u1')
+    client.find_one('users', {'email': 'ana@example.com'})
+    assert database.statements == [
+        ("UPDATE users SET name = %s WHERE id = %s", ('Ana', 'u1')),
+        ("DELETE FROM users WHERE id = %s", ('u1',)),
+        ("SELECT * FROM users WHERE email = %s", ('ana@example.com',)),
+    ]
@@ -0,0 +1,62 @@
+import asyncio
+
+from tests.fakes import FakeDatabase, async_client
+from token_sweeper import PURGE_EXPIRED_SQL, PURGE_USED_SQL, ResetTokenSweeper
+
+
+class Tokens:
+    """Handler que apaga até LIMIT linhas por DELETE de um estoque de tokens expirados e usados"""
+
+    def __init__(self, expired, used):
+        self.left = {PURGE_EXPIRED_SQL: expired, PURGE_USED_SQL: used}
+
+    def __call__(self, query, params):
+        deleted = min(self.left[query], params[-1])
+        self.left[query] -= deleted
+        return deleted
+
+
+def test_sweep_deletes_in_batches_until_nothing_is_left():
+    database = FakeDatabase(Tokens(expired=5, used=2))
+    sweeper = ResetTokenSweeper(async_client(database), interval=0, batch_size=2)
+
+    removed = asyncio.run(sweeper.sweep())
+
+    assert removed == {"expired": 5, "used": 2}
+    # 2 + 2 + 1 expirados; 2 usados e mais um DELETE vazio para confirmar que acabou
+    assert [query for query, _ in database.statements] == [PURGE_EXPIRED_SQL] * 3 + [PURGE_USED_SQL] * 2
+    stats = sweeper.stats()
+    assert (stats["runs"], stats["expired_removed"], stats["used_removed"]) == (1, 5, 2)
+
+
+def test_failed_run_is_counted_and_the_task_keeps_going():
+    calls = []
+
+    def handler(query, params):
+        calls.append(query)
+        if len(calls) == 1:
+            raise RuntimeError("lock wait timeout")
+        return 0
+
+    async def scenario():
+        sweeper = ResetTokenSweeper(async_client(FakeDatabase(handler)), interval=0.001, batch_size=10)
+        sweeper.start()
+        while sweeper.runs == 0:
+            await asyncio.sleep(0.001)
+        await sweeper.stop()
+        return sweeper
+
+    sweeper = asyncio.run(scenario())
+    assert sweeper.failed_runs == 1 and sweeper.runs >= 1
+    assert not sweeper.running
+
+
+def test_zero_interval_disables_the_task():
+    async def scenario():
+        sweeper = ResetTokenSweeper(async_client(), interval=0)
+        sweeper.start()
+        running = sweeper.running
+        await sweeper.stop()
+        return running
+
+    assert asyncio.run(scenario()) is False
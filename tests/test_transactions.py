@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from tests.fakes import FakeDatabase, async_client, sync_client
+
+
+def transaction_events(connection):
+    return [event if isinstance(event, str) else event[1].split()[0] for event in connection.events]
+
+
+def test_async_transaction_uses_one_connection_and_commits_once():
+    async def scenario():
+        client = async_client()
+        async with client.transaction() as tx:
+            await tx.create_record('users', {'name': 'Ana'})
+            await tx.update_record('users', 'u1', {'name': 'Bia'})
+        return client.connection_pool
+
+    pool = asyncio.run(scenario())
+    assert len(pool.opened) == 1
+    assert transaction_events(pool.opened[0]) == ['begin', 'INSERT', 'UPDATE', 'commit']
+    assert pool.freesize == 1
+
+
+def test_async_transaction_rolls_back_on_error():
+    async def scenario():
+        client = async_client()
+        with pytest.raises(ValueError):
+            async with client.transaction() as tx:
+                await tx.create_record('users', {'name': 'Ana'})
+                raise ValueError("falhou no meio")
+        return client.connection_pool
+
+    pool = asyncio.run(scenario())
+    assert transaction_events(pool.opened[0]) == ['begin', 'INSERT', 'rollback']
+    assert pool.freesize == 1
+
+
+def test_change_listeners_run_only_after_commit():
+    async def scenario():
+        client = async_client()
+        notified = []
+
+        async def on_change(user_id):
+            notified.append(('async', user_id))
+
+        client.add_change_listener('users', on_change)
+        client.add_change_listener('users', lambda user_id: notified.append(('sync', user_id)))
+
+        async with client.transaction() as tx:
+            await tx.update_record('users', 'u1', {'name': 'Bia'})
+            await tx.delete_record('users', 'u2')
+            during = list(notified)
+        after_commit = list(notified)
+
+        notified.clear()
+        with pytest.raises(RuntimeError):
+            async with client.transaction() as tx:
+                await tx.update_record('users', 'u3', {'name': 'Caio'})
+                raise RuntimeError
+        after_rollback = list(notified)
+
+        await client.update_record('users', 'u4', {'name': 'Duda'})
+        return during, after_commit, after_rollback, notified
+
+    during, after_commit, after_rollback, direct = asyncio.run(scenario())
+    assert during == []
+    assert after_commit == [('async', 'u1'), ('sync', 'u1'), ('async', 'u2'), ('sync', 'u2')]
+    assert after_rollback == []
+    assert direct == [('async', 'u4'), ('sync', 'u4')]
+
+
+def test_sync_transaction_commits_once_and_releases_the_connection():
+    database = FakeDatabase()
+    client = sync_client(database)
+    with client.transaction() as tx:
+        tx.create_record('users', {'name': 'Ana'})
+        tx.update_record('users', 'u1', {'name': 'Bia'})
+    connection = client.connection_pool._idle[0]
+    assert transaction_events(connection) == ['begin', 'INSERT', 'UPDATE', 'commit']
+    assert client.pool_stats()["in_use"] == 0
+
+
+def test_sync_transaction_rolls_back_on_error():
+    client = sync_client()
+    with pytest.raises(ValueError):
+        with client.transaction() as tx:
+            tx.create_record('users', {'name': 'Ana'})
+            raise ValueError
+    connection = client.connection_pool._idle[0]
+    assert transaction_events(connection) == ['begin', 'INSERT', 'rollback']
+    assert client.pool_stats()["in_use"] == 0
@@ -0,0 +1,88 @@
+import asyncio
+
+from user_cache import UserCache
+
+
+class UsersTable:
+    """Cliente falso com find_one sobre um dict e listeners de mudança como no AsyncMySQLClient"""
+
+    def __init__(self, *users):
+        self.rows = {user['id']: dict(user) for user in users}
+        self.listeners = []
+        self.queries = 0
+        self.during_read = None
+
+    def add_change_listener(self, table, callback):
+        self.listeners.append(callback)
+
+    async def find_one(self, table, filter_dict):
+        self.queries += 1
+        (column, value), = filter_dict.items()
+        row = next((dict(row) for row in self.rows.values() if row[column] == value), None)
+        if self.during_read is not None:
+            hook, self.during_read = self.during_read, None
+            await hook()
+        return row
+
+    async def update_record(self, table, record_id, data):
+        self.rows[record_id].update(data)
+        for callback in self.listeners:
+            await callback(record_id)
+
+
+ANA = {'id': 'u1', 'email': 'ana@example.com', 'name': 'Ana', 'password': 'hash-antigo'}
+
+
+def test_second_lookup_is_served_from_memory():
+    async def scenario():
+        users = UsersTable(ANA)
+        cache = UserCache(users, ttl=60, max_entries=10)
+        await cache.find_by_email('ana@example.com')
+        by_email = await cache.find_by_email('ana@example.com')
+        by_id = await cache.find_by_id('u1')
+        return users.queries, by_email, by_id, cache.stats()
+
+    queries, by_email, by_id, stats = asyncio.run(scenario())
+    assert queries == 1
+    assert by_email == by_id == ANA
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_missing_users_are_not_cached():
+    async def scenario():
+        users = UsersTable()
+        cache = UserCache(users, ttl=60, max_entries=10)
+        await cache.find_by_email('bia@example.com')
+        users.rows['u2'] = {'id': 'u2', 'email': 'bia@example.com', 'name': 'Bia', 'password': 'x'}
+        return await cache.find_by_email('bia@example.com')
+
+    assert asyncio.run(scenario())['id'] == 'u2'
+
+
+def test_update_invalidates_the_cached_user():
+    async def scenario():
+        users = UsersTable(ANA)
+        cache = UserCache(users, ttl=60, max_entries=10)
+        await cache.find_by_email('ana@example.com')
+        await users.update_record('users', 'u1', {'password': 'hash-novo'})
+        return await cache.find_by_email('ana@example.com'), users.queries
+
+    user, queries = asyncio.run(scenario())
+    assert user['password'] == 'hash-novo'
+    assert queries == 2
+
+
+def test_read_racing_an_invalidation_is_not_cached():
+    async def scenario():
+        users = UsersTable(ANA)
+        cache = UserCache(users, ttl=60, max_entries=10)
+        # reset_password faz commit enquanto o SELECT do login ainda está em andamento
+        users.during_read = lambda: users.update_record('users', 'u1', {'password': 'hash-novo'})
+        raced = await cache.find_by_email('ana@example.com')
+        after = await cache.find_by_email('ana@example.com')
+        return raced, after, cache.stats()
+
+    raced, after, stats = asyncio.run(scenario())
+    assert raced['password'] == 'hash-antigo'
+    assert after['password'] == 'hash-novo'
+    assert stats["stale_reads"] == 1
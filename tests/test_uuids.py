@@ -0,0 +1,32 @@
+import uuid
+
+from uuids import UUIDCodec, uuid7
+
+
+def test_uuid7_sets_version_and_variant():
+    value = uuid.UUID(uuid7())
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+
+
+def test_uuid7_ids_sort_in_creation_order():
+    ids = [uuid7() for _ in range(50)]
+    # Mesmo milissegundo só garante a ordem do prefixo de timestamp
+    assert [value[:13] for value in ids] == sorted(value[:13] for value in ids)
+
+
+def test_codec_round_trips_key_columns_only_when_enabled():
+    user_id = uuid7()
+    codec = UUIDCodec(enabled=True)
+    encoded = codec.encode_values(('user_id', 'title'), (user_id, 'Treino A'))
+    assert encoded == (uuid.UUID(user_id).bytes, 'Treino A')
+    assert codec.decode_row({'user_id': encoded[0], 'title': 'Treino A'}) == {'user_id': user_id, 'title': 'Treino A'}
+
+    disabled = UUIDCodec(enabled=False)
+    assert disabled.encode_values(('user_id',), (user_id,)) == (user_id,)
+    assert disabled.encode_id(user_id) == user_id
+
+
+def test_codec_passes_non_uuid_text_through():
+    assert UUIDCodec.to_db('x' * 36) == 'x' * 36
+    assert UUIDCodec.from_db(b'short') == b'short'
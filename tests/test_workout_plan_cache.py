@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from ai_engine import StubEngine
+from workout_plan_cache import WorkoutPlanCache, _duration_minutes, plan_fingerprint, plan_spec
+
+
+@pytest.mark.parametrize("duration, minutes", [
+    ("45", 45),
+    ("45 min", 45),
+    ("45min", 45),
+    ("45 minutos", 45),
+    ("1h", 60),
+    ("1 hora", 60),
+    ("2 Horas", 120),
+    ("1h30", 90),
+    ("1h 30min", 90),
+    ("1,5h", 90),
+    ("1.5 h", 90),
+    ("1,5 horas", 90),
+    ("2 horas e 30 minutos", 150),
+    ("2 hours and 30 minutes", 150),
+    (" 1H30 ", 90),
+])
+def test_duration_minutes_parses_common_formats(duration, minutes):
+    assert _duration_minutes(duration) == minutes
+
+
+@pytest.mark.parametrize("duration, raw", [
+    ("meia hora", "meia hora"),
+    ("  Rápido ", "rapido"),
+    ("0", "0"),
+    ("", ""),
+])
+def test_duration_minutes_falls_back_to_the_normalized_text(duration, raw):
+    assert _duration_minutes(duration) == raw
+
+
+def test_unparsed_durations_do_not_share_a_cache_entry():
+    first = plan_fingerprint(plan_spec('Força', 'Iniciante', 'meia hora'))
+    second = plan_fingerprint(plan_spec('Força', 'Iniciante', 'uma hora'))
+    assert first != second
+
+
+def test_equivalent_requests_share_one_plan_and_each_caller_gets_a_copy():
+    async def scenario():
+        cache = WorkoutPlanCache(ttl=60, max_entries=10)
+        engine = StubEngine(latency=0)
+        calls = []
+
+        async def generate(spec, key):
+            calls.append(key)
+            return await engine.generate_workout(spec)
+
+        first, first_cached = await cache.get_or_generate(plan_spec('Força', 'beginner', '1h'), generate)
+        first['exercises'].clear()
+        second, second_cached = await cache.get_or_generate(plan_spec(' força ', 'Fácil', '60 min'), generate)
+        return first_cached, second, second_cached, calls
+
+    first_cached, second, second_cached, calls = asyncio.run(scenario())
+    assert (first_cached, second_cached) == (False, True)
+    assert len(calls) == 1
+    assert second['title'] == 'Treino de Força (60 min)' and len(second['exercises']) == 12
+
+
+def test_stub_engine_plans_unparsed_durations():
+    plan = asyncio.run(StubEngine(latency=0).generate_workout(plan_spec('Cardio', 'medio', 'meia hora')))
+    assert plan['title'] == 'Treino de Cardio (meia hora)'
+    assert len(plan['exercises']) == 6
+
+
+def test_category_keeps_its_spelling_for_the_engine_but_not_in_the_key():
+    spec = plan_spec('Força', 'Intermediário', '45 min')
+    assert plan_fingerprint(spec) == plan_fingerprint(plan_spec('  FORCA ', 'intermediario', '45'))
+    plan = asyncio.run(StubEngine(latency=0).generate_workout(spec))
+    assert plan['title'] == 'Treino de Força (45 min)'
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from tests.fakes import FakeDatabase, async_client
+from write_buffer import WriteBehindBuffer
+
+COLUMNS = ('id', 'client_name')
+
+
+class RecordingClient:
+    """insert_rows/insert_row que guardam as linhas; `bad` falha sozinha e derruba o lote que a contém"""
+
+    def __init__(self, batch_failures: int = 0, bad=()):
+        self.batch_failures = batch_failures
+        self.bad = set(bad)
+        self.rows = []
+        self.batch_calls = 0
+
+    async def insert_rows(self, table, columns, rows, batch_size=500):
+        self.batch_calls += 1
+        if self.batch_failures:
+            self.batch_failures -= 1
+            raise Exception("Database error: Lost connection")
+        if any(values[0] in self.bad for values in rows):
+            raise Exception("Database error: Data too long")
+        self.rows.extend((table, values) for values in rows)
+        return len(rows)
+
+    async def insert_row(self, table, columns, values):
+        if values[0] in self.bad:
+            raise Exception("Database error: Data too long")
+        self.rows.append((table, values))
+        return 1
+
+
+def run_buffer(client, rows, **options):
+    async def scenario():
+        buffer = WriteBehindBuffer(client, **{"flush_interval": 0.01, "retry_backoff": 0, **options})
+        buffer.start()
+        for values in rows:
+            await buffer.write('status_checks', COLUMNS, values)
+        await buffer.stop()
+        return buffer
+
+    return asyncio.run(scenario())
+
+
+def test_write_without_start_inserts_directly():
+    client = RecordingClient()
+    buffer = WriteBehindBuffer(client)
+    asyncio.run(buffer.write('status_checks', COLUMNS, ('s1', 'app')))
+    assert client.rows == [('status_checks', ('s1', 'app'))]
+    assert buffer.batches == 0
+
+
+def test_batches_by_size_and_stop_drains_the_queue():
+    client = RecordingClient()
+    rows = [(f"s{i}", 'app') for i in range(5)]
+    buffer = run_buffer(client, rows, max_batch=2, flush_interval=60)
+    assert [values for _, values in client.rows] == rows
+    assert buffer.flushed == 5
+    assert buffer.batches == 3
+    assert not buffer.running
+
+
+def test_flushes_after_the_interval():
+    async def scenario():
+        client = RecordingClient()
+        buffer = WriteBehindBuffer(client, max_batch=100, flush_interval=0.01)
+        buffer.start()
+        await buffer.write('status_checks', COLUMNS, ('s1', 'app'))
+        await asyncio.sleep(0.1)
+        written = list(client.rows)
+        await buffer.stop()
+        return written
+
+    assert asyncio.run(scenario()) == [('status_checks', ('s1', 'app'))]
+
+
+def test_retries_a_failed_batch():
+    client = RecordingClient(batch_failures=2)
+    buffer = run_buffer(client, [('s1', 'app'), ('s2', 'app')], retries=3)
+    assert len(client.rows) == 2
+    assert client.batch_calls == 3
+    assert (buffer.retried, buffer.failed, buffer.row_fallbacks) == (2, 0, 0)
+
+
+def test_falls_back_to_single_rows_so_one_bad_row_does_not_drop_the_batch():
+    client = RecordingClient(bad={'s2'})
+    buffer = run_buffer(client, [('s1', 'app'), ('s2', 'app' * 1000), ('s3', 'app')], retries=1)
+    assert [values[0] for _, values in client.rows] == ['s1', 's3']
+    assert (buffer.flushed, buffer.failed, buffer.row_fallbacks) == (2, 1, 1)
+
+
+def test_create_records_batches_rows_and_returns_ids():
+    async def scenario():
+        database = FakeDatabase()
+        client = async_client(database)
+        rows = [{'client_name': f'app{i}'} for i in range(5)]
+        ids = await client.create_records('status_checks', rows, batch_size=2)
+        with pytest.raises(Exception):
+            await client.create_records('status_checks', [{'client_name': 'a'}, {'other': 'b'}])
+        return ids, client.connection_pool.opened[0].events
+
+    ids, events = asyncio.run(scenario())
+    batches = [event for event in events if isinstance(event, tuple) and event[0] == 'executemany']
+    assert [len(batch[2]) for batch in batches] == [2, 2, 1]
+    assert batches[0][1] == "INSERT INTO status_checks (client_name, id) VALUES (%s, %s)"
+    assert [params[1] for batch in batches for params in batch[2]] == ids
+    assert len(set(ids)) == 5